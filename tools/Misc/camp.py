@@ -0,0 +1,65 @@
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import sim
+
+# one output row per replication, in the order of sim.outcome plus time;
+# sim.run(seed, rep=rep) replays any row
+COLS = ("seed", "rep", "kills", "enemies", "rtb", "sorties", "migs_lost", "weapons",
+        "ground_kills", "ground", "sam_shots", "sam_kills", "time")
+# two sided normal quantile for the interval half widths
+Z = 1.96
+
+def one(job):
+    seed, rep, cfg = job
+    res = sim.run(seed, cfg, rep=rep)
+    return (seed, rep) + tuple(res[c] for c in COLS[2:])
+
+def campaign(n, cfg=None, seed=0, workers=None):
+    """n replications of seed, each on its own spawned streams, in order."""
+    jobs = [(seed, i, cfg) for i in range(n)]
+    if workers == 1:
+        return [one(j) for j in jobs]
+    # missions are short, hand them out in batches
+    k = max(1, n // (4 * (workers or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(workers) as ex:
+        return list(ex.map(one, jobs, chunksize=k))
+
+def torec(rows):
+    return np.rec.fromrecords(rows, names=COLS)
+
+def ci(x, z=Z):
+    """mean, lower and upper bound of the normal interval for the mean of x."""
+    x = np.asarray(x, dtype=np.float64)
+    m = x.mean()
+    h = z * x.std(ddof=1) / np.sqrt(len(x)) if len(x) > 1 else np.nan
+    return m, m - h, m + h
+
+def summary(rows, z=Z):
+    """{column: (mean, lo, hi)} over every outcome column."""
+    a = torec(rows)
+    return {c: ci(a[c], z) for c in COLS[2:]}
+
+def tocsv(rows, fn):
+    with open(fn, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(COLS)
+        w.writerows(rows)
+    return fn
+
+if __name__ == "__main__":
+    # python camp.py [n] [out.csv] [key=value ...], keys from sim.CFG
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    fn = sys.argv[2] if len(sys.argv) > 2 else "campaign.csv"
+    cfg = {}
+    for a in sys.argv[3:]:
+        k, v = a.split("=", 1)
+        if k not in sim.CFG:
+            raise SystemExit(f"unknown setting {k}, one of {', '.join(sim.CFG)}")
+        cfg[k] = type(sim.CFG[k])(float(v))
+    rows = campaign(n, cfg)
+    for c, (m, lo, hi) in summary(rows).items():
+        print(f"{c:>12}: {m:8.3f}  [{lo:8.3f}, {hi:8.3f}]")
+    print("exported to ", tocsv(rows, fn))
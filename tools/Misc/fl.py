@@ -1,43 +1,194 @@
 # dynamic_server.py
 import http.server
-import socketserver
+import gzip
 import os
+import re
 import signal
 import sys
+import threading
+import time
 from urllib.parse import urlparse
 
 PORT = 8000
-JSON_FILES = ["f.json", "f2.json", "f3.json"]
+# simulation outputs served (and watched) by path, with their content type;
+# tankin writes the binary terrain and replay, the json files are the older
+# exports and the shots
+FILES = {
+    "f.json": "application/json",
+    "f2.json": "application/json",
+    "f3.json": "application/json",
+    "f.tkh": "application/octet-stream",
+    "f2.tkt": "application/octet-stream",
+}
+# change feed for the browser, see watch()
+EVENTS = "events"
+# seconds between mtime checks and between keep-alive comments on the feed
+POLL = 0.5
+PING = 15
+# files are streamed in pieces this big when sendfile is not available
+CHUNK = 1 << 16
+
+# gzipped bodies by path, (etag, bytes); rebuilt only when the file changes
+gz = {}
+gzlock = threading.Lock()
+# bumped by watch() with the name of the file that changed
+changed = threading.Condition()
+version = [0, None]
+
+def etag(st):
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+def gzipped(path, tag):
+    with gzlock:
+        e = gz.get(path)
+        if e is None or e[0] != tag:
+            with open(path, 'rb') as f:
+                e = gz[path] = (tag, gzip.compress(f.read(), 6))
+        return e[1]
+
+def byterange(h, size):
+    """(start, end) for a single 'bytes=a-b' Range header, None when the
+    header is absent or not understood, False when it is unsatisfiable."""
+    m = re.fullmatch(r"bytes=(\d*)-(\d*)", (h or "").strip())
+    if not m or m.group(1) == m.group(2) == "":
+        return None
+    a, b = m.groups()
+    if a == "":
+        a, b = max(size - int(b), 0), size - 1
+    else:
+        a, b = int(a), min(int(b), size - 1) if b else size - 1
+    if a >= size or a > b:
+        return False
+    return a, b
+
+def watch():
+    # the simulation rewrites its output files in place; poll their mtimes
+    # and wake every open event stream when one moves
+    seen = {}
+    while True:
+        for p in FILES:
+            try:
+                m = os.stat(p).st_mtime_ns
+            except OSError:
+                continue
+            if seen.setdefault(p, m) != m:
+                seen[p] = m
+                with changed:
+                    version[0] += 1
+                    version[1] = p
+                    changed.notify_all()
+        time.sleep(POLL)
 
 class DynamicHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
     def do_GET(self):
         parsed = urlparse(self.path)
         path = parsed.path.lstrip('/')
         print(f"Request path: {path}")
-        
-        if path in JSON_FILES:
+
+        if path == EVENTS:
+            self.events()
+        elif path in FILES:
             try:
-                filesize = os.path.getsize(path)
-                print(f"Serving {path} ({filesize} bytes)")
-                with open(path, 'rb') as f:
-                    content = f.read()
-                self.send_response(200)
-                self.send_header("Content-type", "application/json")
-                self.send_header("Content-Length", str(len(content)))
-                # disable caching completely
-                self.send_header("Cache-Control", "no-store, no-cache, must-revalidate")
-                self.send_header("Pragma", "no-cache")
-                self.send_header("Expires", "0")
-                self.end_headers()
-                self.wfile.write(content)
-            except Exception as e:
+                self.serve(path)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            except FileNotFoundError:
+                self.send_error(404, "Not Found")
+            except OSError as e:
                 print("Error reading file:", e)
                 self.send_error(500, "Internal Server Error")
         else:
             # fallback to default handler for HTML/JS
             super().do_GET()
 
-class GracefulTCPServer(socketserver.TCPServer):
+    def serve(self, path):
+        st = os.stat(path)
+        tag = etag(st)
+        rng = byterange(self.headers.get("Range"), st.st_size)
+        # ranges are always over the plain bytes, so only whole bodies gzip
+        packed = rng is None and "gzip" in self.headers.get("Accept-Encoding", "")
+        if packed:
+            tag = tag[:-1] + '-gz"'
+        if tag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(304)
+            self.common(path, tag)
+            self.end_headers()
+            return
+        if rng is False:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{st.st_size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        print(f"Serving {path} ({st.st_size} bytes)")
+        if packed:
+            body = gzipped(path, tag)
+            self.send_response(200)
+            self.common(path, tag)
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        a, b = rng or (0, st.st_size - 1)
+        n = b - a + 1
+        self.send_response(206 if rng else 200)
+        self.common(path, tag)
+        self.send_header("Accept-Ranges", "bytes")
+        if rng:
+            self.send_header("Content-Range", f"bytes {a}-{b}/{st.st_size}")
+        self.send_header("Content-Length", str(max(n, 0)))
+        self.end_headers()
+        if n <= 0:
+            return
+        self.wfile.flush()
+        with open(path, 'rb') as f:
+            try:
+                self.connection.sendfile(f, a, n)
+            except (AttributeError, NotImplementedError):
+                f.seek(a)
+                while n > 0:
+                    c = f.read(min(CHUNK, n))
+                    if not c:
+                        break
+                    self.wfile.write(c)
+                    n -= len(c)
+
+    def common(self, path, tag):
+        self.send_header("Content-type", FILES[path])
+        self.send_header("ETag", tag)
+        # clients keep a copy but must revalidate it, a 304 costs nothing
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+
+    def events(self):
+        """Server-sent events: one 'change' event naming the file each time
+        watch() sees the simulation rewrite it."""
+        self.send_response(200)
+        self.send_header("Content-type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "keep-alive")
+        self.end_headers()
+        self.close_connection = True
+        with changed:
+            v = version[0]
+        try:
+            while True:
+                with changed:
+                    changed.wait_for(lambda: version[0] != v, PING)
+                    nv, p = version
+                if nv != v:
+                    v = nv
+                    self.wfile.write(f"id: {v}\nevent: change\ndata: {p}\n\n".encode())
+                else:
+                    self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+class GracefulTCPServer(http.server.ThreadingHTTPServer):
     allow_reuse_address = True
     daemon_threads = True
 
@@ -49,6 +200,7 @@ if __name__ == "__main__":
     signal.signal(signal.SIGINT, shutdown_server)
     signal.signal(signal.SIGTERM, shutdown_server)
 
+    threading.Thread(target=watch, daemon=True).start()
     with GracefulTCPServer(("", PORT), DynamicHandler) as httpd:
         print(f"Serving at http://localhost:{PORT}")
         try:
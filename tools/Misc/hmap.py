@@ -0,0 +1,91 @@
+import numpy as np
+
+# uint64 cells per generation block, bounds the kernel's temporaries
+BLK = 1 << 22
+
+def block(i0, i1, ny, rr, ran, wc, r2, wc1):
+    """Heights of grid rows i0..i1 from the tankin hash, as float64.
+
+    Same cells as tankin.doj/dol/hash32: row 0 stays flat, every other
+    cell is 1/|((i*j+i+j)*ran & wc)/r2 - wc1| at world coords i,j. The
+    uint64 arithmetic wraps mod 2**64, which leaves the low bits kept by
+    the wc mask exact."""
+    i = np.arange(i0, i1, dtype=np.uint64)[:, None] * np.uint64(rr)
+    j = np.arange(ny, dtype=np.uint64)[None, :] * np.uint64(rr)
+    z = (i * j + i + j) * np.uint64(ran)
+    z &= np.uint64(wc)
+    v = 1 / np.abs(z.astype(np.float64) / r2 - wc1)
+    if i0 == 0:
+        v[0] = 0
+    return v
+
+def blocks(nx, ny):
+    step = max(1, BLK // max(ny, 1))
+    for i0 in range(0, nx, step):
+        yield i0, min(nx, i0 + step)
+
+class hmap:
+    def __init__(self, nx, ny, rr, dtype=np.float32):
+        self.rr = int(rr)
+        self.h = np.zeros((nx, ny), dtype=dtype)
+
+    @classmethod
+    def fromarr(cls, h, rr):
+        hm = cls.__new__(cls)
+        hm.rr = int(rr)
+        hm.h = h
+        return hm
+
+    @classmethod
+    def fromdict(cls, d, rr, dtype=np.float32):
+        xs = [int(k) for k in d if int(k) >= 0]
+        ys = [int(k) for r in d.values() for k in r if int(k) >= 0]
+        hm = cls(max(xs) // rr + 1, max(ys) // rr + 1, rr, dtype)
+        for i, r in d.items():
+            i = int(i)
+            if i < 0 or i % rr:
+                continue
+            for j, v in r.items():
+                j = int(j)
+                if j < 0 or j % rr:
+                    continue
+                hm.h[i // rr, j // rr] = v
+        return hm
+
+    def todict(self):
+        rr = self.rr
+        ys = [j * rr for j in range(self.h.shape[1])]
+        return {i * rr: dict(zip(ys, row)) for i, row in enumerate(self.h.tolist())}
+
+    def maxx(self):
+        return (self.h.shape[0] - 1) * self.rr
+
+    def maxy(self):
+        return (self.h.shape[1] - 1) * self.rr
+
+    def cx(self, x):
+        return min(max(x, 0), self.maxx())
+
+    def cy(self, y):
+        return min(max(y, 0), self.maxy())
+
+    def ix(self, x):
+        return min(max(int(x // self.rr), 0), self.h.shape[0] - 1)
+
+    def iy(self, y):
+        return min(max(int(y // self.rr), 0), self.h.shape[1] - 1)
+
+    def inb(self, x, y):
+        return 0 <= x <= self.maxx() and 0 <= y <= self.maxy()
+
+    def at(self, x, y):
+        return float(self.h[self.ix(x), self.iy(y)])
+
+    def snap(self, x, y):
+        return x - x % self.rr, y - y % self.rr
+
+    def gen(self, ran, wc, r2, wc1):
+        nx, ny = self.h.shape
+        for i0, i1 in blocks(nx, ny):
+            self.h[i0:i1] = block(i0, i1, ny, self.rr, ran, wc, r2, wc1)
+        return self
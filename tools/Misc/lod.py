@@ -0,0 +1,138 @@
+import os
+import struct
+from collections import OrderedDict
+import numpy as np
+
+# level of detail pyramid for a heightmap: level k pools 2**k cells per
+# side. Level 0 is the heightmap itself, levels 1.. live in a side file
+#   header: magic, version, pooling, levels, base nx, base ny; then an
+#   int32 (levels, 2) shape table and the float32 levels, each 32 aligned
+HDR = 32
+MAG = b"TKLP"
+VER = 1
+PFMT = "<4sHHIII"
+HOW = ("mean", "max")
+# rows pooled per block, keeps huge memory mapped bases out of RAM
+ROWS = 1 << 12
+# tile edge in cells and how many tiles the viewer keeps
+TILE = 256
+KEEP = 256
+
+def pool(a, how="mean"):
+    """2x2 pooling of a, odd edges padded by repeating the last row/col."""
+    nx, ny = a.shape
+    out = np.empty(((nx + 1) // 2, (ny + 1) // 2), dtype=np.float32)
+    for i0 in range(0, nx, ROWS):
+        b = np.asarray(a[i0:i0 + ROWS], dtype=np.float32)
+        b = np.pad(b, ((0, len(b) % 2), (0, ny % 2)), mode="edge")
+        b = b.reshape(len(b) // 2, 2, b.shape[1] // 2, 2)
+        out[i0 // 2:i0 // 2 + len(b)] = b.max(axis=(1, 3)) if how == "max" else b.mean(axis=(1, 3))
+    return out
+
+def build(h, how="mean", lo=64):
+    """Levels 1.. of h until both sides are at most lo cells."""
+    lv = []
+    a = h
+    while max(a.shape) > lo:
+        a = pool(a, how)
+        lv.append(a)
+    return lv
+
+def pad(n):
+    return -n % HDR
+
+def save(fn, base, lv, how="mean"):
+    tab = np.array([a.shape for a in lv], dtype=np.int32).reshape(-1, 2)
+    with open(fn, "wb") as f:
+        f.write(struct.pack(PFMT, MAG, VER, HOW.index(how), len(lv), *base).ljust(HDR, b"\0"))
+        f.write(tab.tobytes())
+        f.write(b"\0" * pad(tab.nbytes))
+        for a in lv:
+            b = np.ascontiguousarray(a, dtype=np.float32).tobytes()
+            f.write(b)
+            f.write(b"\0" * pad(len(b)))
+    return fn
+
+def load(fn):
+    with open(fn, "rb") as f:
+        mag, ver, how, n, nx, ny = struct.unpack(PFMT, f.read(HDR)[:struct.calcsize(PFMT)])
+        if mag != MAG or ver != VER:
+            raise ValueError(f"not a {MAG.decode()} v{VER} file")
+        tab = np.frombuffer(f.read(n * 8), dtype=np.int32).reshape(n, 2)
+    off = HDR + n * 8 + pad(n * 8)
+    lv = []
+    for sx, sy in tab:
+        lv.append(np.memmap(fn, dtype=np.float32, mode="r", offset=off, shape=(int(sx), int(sy))))
+        off += int(sx) * int(sy) * 4
+        off += pad(int(sx) * int(sy) * 4)
+    return (nx, ny), HOW[how], lv
+
+def pyramid(hm, fn=None, how="mean", src=None):
+    """[level0, level1, ...] for hm, cached in fn next to the terrain file.
+
+    src is the terrain file hm was loaded from (default the file a memory
+    mapped base reads). The cache is rebuilt when it is older than src, was
+    made from a different base shape or pooling, or there is no src to
+    compare against."""
+    base = hm.h.shape
+    src = src if src is not None else getattr(hm.h, "filename", None)
+    if fn is not None and os.path.exists(fn):
+        fresh = src is not None and os.path.exists(src) and os.path.getmtime(fn) >= os.path.getmtime(src)
+        try:
+            b, h, lv = load(fn)
+            if fresh and b == base and h == how:
+                return [hm.h] + lv
+        except (OSError, ValueError, struct.error):
+            pass
+    lv = build(hm.h, how)
+    if fn is not None:
+        save(fn, base, lv, how)
+        b, h, lv = load(fn)
+    return [hm.h] + lv
+
+class tiles:
+    """Window reads over a pyramid through a small LRU tile cache."""
+    def __init__(self, lv, rr=1):
+        self.lv = lv
+        self.rr = rr
+        self.cache = OrderedDict()
+
+    def level(self, span, px):
+        # coarsest level still giving at least px cells over span base cells
+        k = int(np.floor(np.log2(max(span / max(px, 1), 1))))
+        return min(k, len(self.lv) - 1)
+
+    def tile(self, k, ti, tj):
+        key = (k, ti, tj)
+        t = self.cache.get(key)
+        if t is None:
+            t = np.array(self.lv[k][ti * TILE:(ti + 1) * TILE, tj * TILE:(tj + 1) * TILE])
+            self.cache[key] = t
+            if len(self.cache) > KEEP:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+        return t
+
+    def view(self, x0, x1, y0, y1, px):
+        """Heights covering world x0..x1, y0..y1 at about px cells across.
+
+        Returns the array and its (x0, x1, y0, y1) extent in world units."""
+        rr = self.rr
+        k = self.level(max(x1 - x0, y1 - y0) / rr, px)
+        a = self.lv[k]
+        s = rr * 2 ** k
+        i0 = int(np.clip(x0 // s, 0, a.shape[0] - 1))
+        i1 = int(np.clip(-(-x1 // s), i0 + 1, a.shape[0]))
+        j0 = int(np.clip(y0 // s, 0, a.shape[1] - 1))
+        j1 = int(np.clip(-(-y1 // s), j0 + 1, a.shape[1]))
+        out = np.empty((i1 - i0, j1 - j0), dtype=np.float32)
+        for ti in range(i0 // TILE, (i1 - 1) // TILE + 1):
+            for tj in range(j0 // TILE, (j1 - 1) // TILE + 1):
+                t = self.tile(k, ti, tj)
+                a0, b0 = ti * TILE, tj * TILE
+                ri = slice(max(i0, a0), min(i1, a0 + len(t)))
+                ci = slice(max(j0, b0), min(j1, b0 + t.shape[1]))
+                out[ri.start - i0:ri.stop - i0, ci.start - j0:ci.stop - j0] = \
+                    t[ri.start - a0:ri.stop - a0, ci.start - b0:ci.stop - b0]
+        return out, (i0 * s, i1 * s, j0 * s, j1 * s)
@@ -0,0 +1,72 @@
+import numpy as np
+
+# cells sampled per chunk of rays, keeps the (rays, steps) work arrays to a
+# few tens of MB; rays are chunked by length so a chunk pads each ray to at
+# most twice its own length
+CHUNK = 1 << 18
+
+def ends(hm, p, up):
+    p = np.asarray(p, dtype=np.float64).reshape(-1, 2)
+    x = np.clip(np.round(p[:, 0]), 0, hm.maxx()).astype(np.int64)
+    y = np.clip(np.round(p[:, 1]), 0, hm.maxy()).astype(np.int64)
+    z = np.round(ground(hm, x, y) + np.asarray(up, dtype=np.float64))
+    return x, y, z
+
+def ground(hm, x, y):
+    rr = hm.rr
+    i = np.clip(x // rr, 0, hm.h.shape[0] - 1)
+    j = np.clip(y // rr, 0, hm.h.shape[1] - 1)
+    return hm.h[i, j].astype(np.float64)
+
+def rays(hm, sx, sy, sz, ex, ey, ez):
+    # Bresenham walk from start (inclusive) to end (exclusive) for every ray at
+    # once; the minor axis offset after k major steps is ceil(k*dm/dM - 1/2)
+    dx = np.abs(ex - sx)
+    dy = np.abs(ey - sy)
+    stx = np.where(sx < ex, 1, -1)
+    sty = np.where(sy < ey, 1, -1)
+    xm = dx > dy
+    dM = np.where(xm, dx, dy)
+    dm = np.where(xm, dy, dx)
+    n = len(sx)
+    ok = np.ones(n, dtype=bool)
+    tot = np.hypot(ex - sx, ey - sy)
+    order = np.argsort(dM, kind="stable")
+    dMs = dM[order]
+    a = np.searchsorted(dMs, 1)
+    while a < n:
+        lim = 2 * int(dMs[a])
+        b = min(n, a + max(1, CHUNK // lim), int(np.searchsorted(dMs, lim, "right")))
+        i = order[a:b]
+        a = b
+        steps = int(dM[i].max())
+        k = np.arange(steps, dtype=np.int64)[None, :]
+        M = dM[i, None]
+        off = -((M - 2 * k * dm[i, None]) // np.maximum(2 * M, 1))
+        x0, y0 = sx[i, None], sy[i, None]
+        x = x0 + stx[i, None] * np.where(xm[i, None], k, off)
+        y = y0 + sty[i, None] * np.where(xm[i, None], off, k)
+        live = k < M
+        t = np.hypot(x - x0, y - y0) / np.where(tot[i, None] > 0, tot[i, None], 1)
+        hol = sz[i, None] + t * (ez[i, None] - sz[i, None])
+        g = ground(hm, np.where(live, x, x0), np.where(live, y, y0))
+        ok[i] = ~np.any(live & (g > hol), axis=1)
+    return ok & ~(ground(hm, ex, ey) > ez)
+
+def losm(hm, a, aup, b, bup, rng):
+    """Visibility matrix between shooters a (n,2) and targets b (m,2).
+
+    aup/bup are heights above ground (eye and target height), scalars or one
+    per shooter/target, rng the per-shooter range limited on dx+dy+dz like
+    tankin.loscheck."""
+    sx, sy, sz = ends(hm, a, aup)
+    ex, ey, ez = ends(hm, b, bup)
+    n, m = len(sx), len(ex)
+    rng = np.broadcast_to(np.asarray(rng, dtype=np.float64), (n,))
+    dis = (np.abs(ex[None, :] - sx[:, None]) + np.abs(ey[None, :] - sy[:, None])
+           + np.abs(ez[None, :] - sz[:, None]))
+    vis = dis <= rng[:, None]
+    si, ti = np.nonzero(vis)
+    if len(si):
+        vis[si, ti] = rays(hm, sx[si], sy[si], sz[si], ex[ti], ey[ti], ez[ti])
+    return vis
@@ -1,10 +1,13 @@
 # === Part 1: Imports and Utilities ===
 import math
-import random
 import sys
 import numpy as np
+from streams import streams
 
 deadtargets = {}
+# random streams of the current mission, one per entity name; main()
+# replaces this with the streams of its seed
+rs = streams()
 
 def angle_diff(a, b):
     """Minimal difference between two angles in degrees."""
@@ -15,10 +18,11 @@ maxtime = 400
 
 # --- Radar class ---
 class Radar:
-    def __init__(self, max_range_km=50, base_detection_prob=0.9):
+    def __init__(self, rng, max_range_km=50, base_detection_prob=0.9):
         self.max_range_km = max_range_km
         self.base_detection_prob = base_detection_prob
         self.jamming_level = 0.0
+        self.rng = rng
 
     def set_jamming_level(self, level):
         self.jamming_level = max(0.0, min(1.0, level))
@@ -35,7 +39,7 @@ class Radar:
         detection_chance *= min(2.0, rcs_factor)
         detection_chance *= (1 - self.jamming_level)
         detection_chance = max(1.0, min(1.0, detection_chance))
-        return random.random() < detection_chance
+        return self.rng.random() < detection_chance
 
 class EnemyAircraft:
     def __init__(self, eid, aircraft_type, position, heading, speed, altitude, rcs):
@@ -65,15 +69,16 @@ class EnemyAircraft:
 def generate_random_enemies(n=5):
     enemies = []
     for i in range(n):
-        is_bomber = random.random() < 0.4
+        g = rs(f"Enemy{i+1}")
+        is_bomber = g.random() < 0.4
         enemy = EnemyAircraft(
             eid=f"Enemy{i+1}",
             aircraft_type="bomber" if is_bomber else "fighter",
-            position=(random.uniform(30, 100), random.uniform(-50, 50)),
-            heading=random.uniform(180, 360),
-            speed=random.uniform(700, 900) if is_bomber else random.uniform(1100, 1400),
-            altitude=random.uniform(8000, 13000),
-            rcs=random.uniform(8, 15) if is_bomber else random.uniform(1.5, 4.0)
+            position=(g.uniform(30, 100), g.uniform(-50, 50)),
+            heading=g.uniform(180, 360),
+            speed=g.uniform(700, 900) if is_bomber else g.uniform(1100, 1400),
+            altitude=g.uniform(8000, 13000),
+            rcs=g.uniform(8, 15) if is_bomber else g.uniform(1.5, 4.0)
         )
         enemies.append(enemy)
     return enemies
@@ -86,6 +91,7 @@ class Missile:
         self.alive = True
         self.max_turn_rate = 20  # degrees per second
         self.heading = launcher.heading
+        self.rng = rs(f"{launcher.name}/missile{launcher.weapons_fired}")
 
     def update(self, time_sec=1.0):
         if not self.alive or not self.target.alive:
@@ -112,7 +118,7 @@ class Missile:
         # Check for hit (within 0.2 km)
         if self._distance_to_point(self.target.position) < 0.2:
             hit_chance = 0.8
-            if random.random() < hit_chance:
+            if self.rng.random() < hit_chance:
                 print(f"Missile from {self.launcher.name} hit {self.target.id}!")
                 deadtargets.setdefault(self.target.id)
                 self.target.alive = False
@@ -149,7 +155,8 @@ class MiG25:
         self.evasive_time = 10
         self.alive=1
 
-        self.radar = Radar(max_range_km=60, base_detection_prob=0.8)
+        self.radar = Radar(rs(f"{name}/radar"), max_range_km=60, base_detection_prob=0.8)
+        self.rng = rs(name)
 
     def set_jamming(self, level):
         self.radar.set_jamming_level(level)
@@ -168,7 +175,7 @@ class MiG25:
         return self.radar.detect(self.position, target.position, target.rcs)
 
     def receive_gci_command(self, target):
-        if random.random() < self.command_failure_chance:
+        if self.rng.random() < self.command_failure_chance:
             print(f"{self.name} GCI command disrupted by ECM!")
             return
         self.heading = self._bearing_to_point(target.position)
@@ -234,7 +241,8 @@ class MiG23:
         self.dogfight_mode = False
         self.alive=1
 
-        self.radar = Radar(max_range_km=30, base_detection_prob=0.8)
+        self.radar = Radar(rs(f"{name}/radar"), max_range_km=30, base_detection_prob=0.8)
+        self.rng = rs(name)
 
     def set_jamming(self, level):
         self.radar.set_jamming_level(level)
@@ -253,7 +261,7 @@ class MiG23:
         return self.radar.detect(self.position, target.position, target.rcs)
 
     def receive_gci_command(self, target):
-        if random.random() < self.command_failure_chance:
+        if self.rng.random() < self.command_failure_chance:
             print(f"{self.name} GCI command disrupted by ECM!")
             return
         if not self.dogfight_mode:
@@ -269,7 +277,7 @@ class MiG23:
         fuel_burn = self.fuel_burn_rate * time_sec
         if self.dogfight_mode:
             fuel_burn *= 1.5
-            self.heading = (self.heading + random.uniform(-10, 10)) % 360
+            self.heading = (self.heading + self.rng.uniform(-10, 10)) % 360
         self.fuel -= fuel_burn
 
         dist_km = self.speed * (time_sec / 3600)
@@ -290,7 +298,7 @@ class MiG23:
         if bearing_diff > 10:
             return False
         self.weapons_fired += 1
-        hit = random.random() < 0.6
+        hit = self.rng.random() < 0.6
         if hit:
             print(f"{self.name} fired guns and hit {target.id} at {distance:.1f} km!")
             target.alive = False
@@ -369,6 +377,7 @@ class MiG27:
         self.rtb_mode = False
         self.target_ground = None
         self.alive=1
+        self.rng = rs(name)
 
     def _distance_to_point(self, point):
         dx = point[0] - self.position[0]
@@ -378,7 +387,7 @@ class MiG27:
     def select_ground_target(self, targets):
         alive_targets = [t for t in targets if t.alive]
         if alive_targets:
-            self.target_ground = random.choice(alive_targets)
+            self.target_ground = alive_targets[self.rng.integers(len(alive_targets))]
             print(f"{self.name} selected ground target {self.target_ground.id}")
         else:
          	self.rtb_mode=True
@@ -474,6 +483,7 @@ class GroundDefense:
         self.cooldown = 0
         self.cooldown_time = cooldown_time
         self.hit_chance = hit_chance
+        self.rng = rs(name)
 
     def _distance_to(self, aircraft):
         dx = aircraft.position[0] - self.position[0]
@@ -491,11 +501,14 @@ class GroundDefense:
             self.cooldown = self.cooldown_time
             print(f"{self.name} fires at {aircraft.name}")
             evade_penalty = 0.5 if getattr(aircraft, "evasive", False) else 1.0
-            if random.random() < self.hit_chance * evade_penalty:
+            if self.rng.random() < self.hit_chance * evade_penalty:
                 aircraft.alive = False
                 print(f"{aircraft.name} was destroyed by {self.name}!")
 
-def main():
+def main(seed=None):
+    global rs
+    rs = streams(seed)
+    deadtargets.clear()
     # Create aircraft
     mig25s = [MiG25(f"MiG25_{i+1}") for i in range(2)]
     mig23s = [MiG23(f"MiG23_{i+1}") for i in range(2)]
@@ -503,7 +516,7 @@ def main():
 
     enemies = generate_random_enemies(6)
     starten = len(enemies)
-    ground_targets = [GroundTarget(f"GT{i+1}", (random.uniform(10, 40), random.uniform(-20, 20))) for i in range(3)]
+    ground_targets = [GroundTarget(f"GT{i+1}", (rs(f"GT{i+1}").uniform(10, 40), rs(f"GT{i+1}").uniform(-20, 20))) for i in range(3)]
 
     # Initialize SAM ground defenses
     sams = [
@@ -563,7 +576,7 @@ def main():
                 print(f"{mig.name} RTB: All targets destroyed")
                 continue
             if(len(live_targets)>1):
-            	target = live_targets[random.randrange(1,len(live_targets))]
+            	target = live_targets[mig.rng.integers(1,len(live_targets))]
             else:
             	target = live_targets[0]
             mig.receive_gci_command(target)
@@ -1,7 +1,10 @@
 # nuct.py
+import os
 import sympy as sp
 import cons
 
+ENGINE=os.environ.get("NUCT_ENGINE","sym")
+
 phi = sp.GoldenRatio
 alpha_fs = 1/((((4*sp.pi)-6)**phi)**phi)  
 alpha = 1 / alpha_fs
@@ -245,8 +248,70 @@ class NuclearPenetrationModel:
 
     	return f
 
-    
+
+NUMS=("getkk","getearth","geth","getsec","getpl","getbigg","getg","getpow",
+	"getwork","gettime","gethw","magc","getelm","getema","getperm","getk",
+	"corprma","prmaen","evpr","getc","gethb","getrhb","gettp","getalp",
+	"getalpd","getinalp","getinvtp")
+NUMA=("ec","am","osc","brem","disc","shellt","compt","evperj","c3",
+	"avogadro","av","crad","pm","req")
+NUMG=("phi","alpha_fs","alpha","pm","prma","unage","picor")
+symo=None
+numc={}
+numa={}
+numgc={}
+
+def symobj():
+	global symo
+	if symo is None:
+		symo=NuclearPenetrationModel()
+	return symo
+
+def numv(name):
+	if name not in numc:
+		numc[name]=float(sp.N(getattr(symobj(),name)()))
+	return numc[name]
+
+def numk():
+	if len(numa)==0:
+		s=symobj()
+		for k in NUMA:
+			numa[k]=float(sp.N(getattr(s,k)))
+	return numa
+
+def numg():
+	if len(numgc)==0:
+		for k in NUMG:
+			numgc[k]=float(sp.N(globals()[k]))
+	return numgc
+
+def numtab():
+	for k in NUMS:
+		numv(k)
+	numk()
+	numg()
+	return numc
+
+class NumericPenetrationModel(NuclearPenetrationModel):
+	def __init__(self):
+		self.E = sp.symbols('E')
+		self.n_e = sp.symbols('n_e')
+		for k in NUMA:
+			setattr(self,k,numk()[k])
+		self.kk=0
+
+for _m in NUMS:
+	setattr(NumericPenetrationModel,_m,lambda self,_m=_m: numv(_m))
+
+def setengine(e):
+	global ENGINE
+	if e not in ("sym","num"):
+		raise ValueError("engine must be 'sym' or 'num'")
+	ENGINE=e
+
 def baseobj():
+	if ENGINE=="num":
+		return NumericPenetrationModel()
 	return NuclearPenetrationModel()
 
 
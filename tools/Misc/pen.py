@@ -1,4 +1,8 @@
 import math
+import os
+import copy
+import functools
+import numpy as np
 import nuct
 import sympy as sp
 import cons
@@ -9,6 +13,10 @@ req=cons.req
 crad=cons.crad
 avo=cons.avo
 ec=cons.ec
+# getvel mode: "fast" reuses one result per material state, "exact" always
+# walks the full getvol/domaxld chain (for validation)
+VEL=os.environ.get("PEN_VEL","fast")
+velc={}
 
 class Material:
     def __init__(self, name, molar_mass_kg_mol, density_kg_m3, atomic_radius_m, atomic_number,
@@ -58,9 +66,18 @@ class Material:
         self.av=(((nuct.alpha**nuct.phi)**7)/3)
         self.am=nuct.alpha**nuct.phi
         
+    def __setattr__(self,k,v):
+        if self.__dict__.get("frozen"):
+            raise AttributeError(f"{self.name} is a shared registry material, take a copy with getmat()")
+        self.__dict__[k]=v
+        
+    def copy(self):
+        c=copy.copy(self)
+        c.__dict__["frozen"]=False
+        return c
     
     def getrange(self,round_mas,diam):
-    	airdens=getn().density
+    	airdens=matref("n").density
     	de=self.density*self.fill
     	lenn=self.getroundlenmass(round_mas,diam)
     	de=self.density/airdens
@@ -173,9 +190,34 @@ class Material:
     	th=self.pen_angle(th,effective_angle,en,rd)
     	return th/mult
     	
+    # array pen: rd/mass/speed default to mat's own round and broadcast
+    # against the angles
+    def pen_batch(self,mat,angle1,angle2,rd=None,mass=None,speed=None):
+    	if rd is None or mass is None or speed is None:
+    		r0,s0,m0,_=self.getroundparam(mat)
+    		rd=r0 if rd is None else rd
+    		mass=m0 if mass is None else mass
+    		speed=s0 if speed is None else speed
+    	rd,mass,speed,a1,a2=np.broadcast_arrays(*(np.asarray(x,dtype=np.float64) for x in (rd,mass,speed,angle1,angle2)))
+    	ang=combine(a1,a2)
+    	en=.5*mass*(speed**2)
+    	hv=float(self.base_hvl)
+    	hvl=hv*zrule()
+    	mult=np.where(rd>hvl,rd/hvl,1)**2
+    	self.material_energy_density_j_per_hvl=mat.f4*estfix(self)
+    	med=float(self.material_energy_density_j_per_hvl)
+    	phi=float(self.phi)
+    	th=(en/float(self.melt_one_hvl()))*hv/phi/float(nuct.picor)
+    	with np.errstate(divide="ignore"):
+    		d=th/(90/ang)**(4**phi)
+    	e=en/np.where(rd<hv,hv**2,(rd/hv)**2)
+    	d=np.maximum((e/med)*hv,d)
+    	d=np.where(ang==0,0,d)
+    	return d/mult
+    	
     def barrellen(self,mat):
     	rd,speed,mass,en=self.getroundparam(mat)
-    	lenn=getsteel().getbarrellen(mat,mat.getroundlenmass(mass,rd),speed,rd)
+    	lenn=matref("steel").getbarrellen(mat,mat.getroundlenmass(mass,rd),speed,rd)
     	return lenn,rd
     	
     def getroundparam(self,mat):
@@ -198,7 +240,22 @@ class Material:
         d= self.base_pen(d, round_energy, round_diameter)
         return d
         
+    def velkey(self):
+        return (self.name,self.molar_mass,self.density,self.atomic_radius,self.atomic_number,
+                self.cohesive_energy_ev,self.base_hvl,self.weak_factor,self.bafac,self.f3)
+        
     def getvel(self,round_diameter1):
+        # the diameter cancels out of the whole chain: getav is sqrt(2*sh*mp),
+        # getba's ra**2 divides out and barmm only sees base_hvl, so one
+        # result per material state serves every diameter
+        if VEL=="exact":
+            return self.getvelx(round_diameter1)
+        k=self.velkey()
+        if k not in velc:
+            velc[k]=self.getvelx(round_diameter1)
+        return velc[k]
+        
+    def getvelx(self,round_diameter1):
         ba,airvol=self.getvol(round_diameter1)
         if(self.bafac==1):
         	v1=airvol
@@ -236,12 +293,12 @@ class Material:
         return airvol
         
     def getairen(self,mp,ra):
-        n=getn()
+        n=matref("n")
         airperhit=self.getaph(ra)
         return airperhit*getsh_per_kg(n)*mp
         
     def getaph(self,ra):
-        n=getn()
+        n=matref("n")
         return n.density*(ra**2)*nuct.picor
         
     def domaxld(self,ba,airvol):
@@ -284,8 +341,8 @@ class Material:
     	logl=math.log2(fine)
     	logl=abs(logl)  
     	f= rat*roundl*logl
-    	d1=(getsteel().density)/(1510)
-    	d1*=getsteel().base_hvl
+    	d1=(matref("steel").density)/(1510)
+    	d1*=matref("steel").base_hvl
     	cut=d1*2
     	if(diam>cut):
     		foo=diam/cut
@@ -428,18 +485,47 @@ class Material:
             return round_energy_j / (self.base_hvl** 2)
         return round_energy_j / ((round_diameter/self.base_hvl) ** 2)
 
+def fold(a):
+    # array clean_angle: any angle onto [0,90]
+    a=np.mod(a,180)
+    return np.where(a>90,180-a,a)
+
+def combine(a1,a2):
+    # array combine_angles
+    a1=fold(a1)
+    a2=fold(a2)
+    return np.minimum(a1*(1-(90-a2)/90),90)
+
 def estfix(self):
         return (self.j_high_estimate*self.hvl_mass_kg())
         
 def cohfrommp(mp):
-		he=(getsteel().db*mp)/getsteel().avogadro
-		he=he/getsteel().ev_to_joule
+		st=matref("steel")
+		he=(st.db*mp)/st.avogadro
+		he=he/st.ev_to_joule
 		return he*2*zrule()
 		
 def zrule():
 	return 6
 
-def getsteel():
+mats={}
+matf={}
+
+def regmat(key,fn):
+    matf[key]=fn
+    mats.pop(key,None)
+
+def matref(key):
+    if key not in mats:
+        m=matf[key]()
+        m.frozen=True
+        mats[key]=m
+    return mats[key]
+
+def getmat(key):
+    return matref(key).copy()
+
+def mksteel():
     steel = Material(
         name="Iron (Steel)",
         molar_mass_kg_mol=55.85/mass_g,
@@ -454,7 +540,7 @@ def getsteel():
     steel.material_energy_density_j_per_hvl=estfix(steel)
     return steel
     
-def getdu():
+def mkdu():
     du=Material(
     name="Uranium",
     molar_mass_kg_mol=238/mass_g,
@@ -469,7 +555,7 @@ def getdu():
     du.material_energy_density_j_per_hvl=estfix(du)
     return du
     
-def getcf():
+def mkcf():
     cf=Material(
     name="CF",
     molar_mass_kg_mol=12/mass_g,
@@ -492,7 +578,7 @@ rp1tendensity=1400
 waterfrac=.9
 invw=1-waterfrac
 
-def getn():
+def mkn():
     n=Material(
     name="N",
     molar_mass_kg_mol=14/mass_g,
@@ -500,13 +586,13 @@ def getn():
     atomic_radius_m=7e-11,
     atomic_number=7,
     cohesive_energy_ev=1,
-    base_hvl=(getsteel().density/dn)*getsteel().base_hvl,
+    base_hvl=(matref("steel").density/dn)*matref("steel").base_hvl,
     material_energy_density_j_per_hvl=1,
     weak_factor=1
     )
     return n
     
-def getrp1tenpct():
+def mkrp1tenpct():
     rp1tenpct=Material(
     name="RP1tenpct",
     molar_mass_kg_mol=rpmo/mass_g,
@@ -516,12 +602,12 @@ def getrp1tenpct():
     cohesive_energy_ev=cohfrommp(60),
     base_hvl=10/cm_m,
     material_energy_density_j_per_hvl=1,
-    weak_factor=(((getsteel().density)/rp1tendensity)**6)*nuct.alpha*(1/rpsolidfrac)
+    weak_factor=(((matref("steel").density)/rp1tendensity)**6)*nuct.alpha*(1/rpsolidfrac)
     )
     rp1tenpct.material_energy_density_j_per_hvl=estfix(rp1tenpct)   
     return rp1tenpct
             
-def getskin():
+def mkskin():
     skin=Material(
     name="Organic",
     molar_mass_kg_mol=1,
@@ -535,9 +621,34 @@ def getskin():
     )
     skin.material_energy_density_j_per_hvl=estfix(skin)
     return skin
+
+regmat("steel",mksteel)
+regmat("du",mkdu)
+regmat("cf",mkcf)
+regmat("n",mkn)
+regmat("rp1tenpct",mkrp1tenpct)
+regmat("skin",mkskin)
+
+def getsteel():
+    return getmat("steel")
+
+def getdu():
+    return getmat("du")
+
+def getcf():
+    return getmat("cf")
+
+def getn():
+    return getmat("n")
+
+def getrp1tenpct():
+    return getmat("rp1tenpct")
+
+def getskin():
+    return getmat("skin")
     
 def getht(self):
-    nm=(self.molar_mass/self.density)/getn().density
+    nm=(self.molar_mass/self.density)/matref("n").density
     side=nm**(1/3)
     ac=self.avogadro**(2/3)
     mp=getmp(self)
@@ -580,11 +691,13 @@ def getsh_per_kg(self):
     return sh/ker
     
 def baseproj():
-    return getsteel().getparp(getsteel().getbarmass(getsteel()),getsteel())
+    st=matref("steel")
+    return st.getparp(st.getbarmass(st),st)
     
 def barpm():
     rd,speed,mass,en=baseproj()
-    barml=getsteel().getbarrellen(getsteel(),getsteel().getroundlenmass(mass,rd),speed,rd)
+    st=matref("steel")
+    barml=st.getbarrellen(st,st.getroundlenmass(mass,rd),speed,rd)
     return barml/rd
     
 def baseshot():
@@ -594,6 +707,12 @@ def maxshot():
 	res=(barpm()*baseshot())
 	return res
 
+def setvel(mode):
+    global VEL
+    if mode not in ("fast","exact"):
+        raise ValueError("getvel mode must be 'fast' or 'exact'")
+    VEL=mode
+
 def basevals(mat):
     	mat.bafac=1
     	mat.f2=1
@@ -607,10 +726,19 @@ def getspeed(mat):
     	mat=basevals(mat)
     	return mat.gets(1)
 
-steel=getsteel()
-du=getdu()
-cf=getrp1tenpct()
-steel.print_summary()
+# shared working copies, built on first use; the round scripts tweak these
+# in place exactly like the old module level steel/du/cf did
+@functools.cache
+def basesteel():
+    return getsteel()
+
+@functools.cache
+def basedu():
+    return getdu()
+
+@functools.cache
+def basecf():
+    return getrp1tenpct()
    
 def getstr(mat):
     mat = basevals(mat)
@@ -625,11 +753,19 @@ def do10gel():
     gel = getrp1tenpct()
     return gel.j_high_estimate / mat.j_high_estimate
 
-strength = bhn250()
-gels = do10gel()
+getstrength = functools.cache(bhn250)
+getgels = functools.cache(do10gel)
+
+LAZY = {"steel": basesteel, "du": basedu, "cf": basecf,
+        "strength": getstrength, "gels": getgels}
+
+def __getattr__(name):
+    if name in LAZY:
+        return LAZY[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def lethalcalc(mat, en, exp):
-    sk = getskin()
+    sk = matref("skin")
     sken = sk.material_energy_density_j_per_hvl / (2**nuct.phi**6)
     en += sk.exen(exp)
     if en < sken:
@@ -644,25 +780,31 @@ def lethalcalc(mat, en, exp):
     hvls = hvls * ar
     return hvls
 
-def dopen(mat):
+# one round against armor (default a fresh plate), results as a dict
+def dopenr(mat,armor=None,verbose=False):
     	round_diameter = mat.getdam(1)
     	ld,rspeed,mm=mat.getvel(round_diameter)
     	round_diameter*=mm
     	round_mas=mat.getmass(round_diameter,ld)    	
     	round_energy = (.5*round_mas*(rspeed**2))
-    	armor=steel
-    	if(round_diameter==.009):
-    		armor=getrp1tenpct()
-    		armor.base_hvl=round_diameter*2	
+    	# the default plate (and gel) take steel's energy density as dopen
+    	# did, an explicit armor its own as in Material.pen
+    	edens=armor
+    	if armor is None:
+    		armor=getsteel()
+    		edens=matref("steel")
+    		if(round_diameter==.009):
+    			armor=getrp1tenpct()
+    			armor.base_hvl=round_diameter*2	
     	hvl=armor.base_hvl*zrule()
     	mult=1
     	if(round_diameter>hvl):
     		mult=round_diameter/hvl
     	mult=mult**2
-    	armor.material_energy_density_j_per_hvl=mat.f4*estfix(steel)
+    	armor.material_energy_density_j_per_hvl=mat.f4*estfix(edens)
     	depth= 1
     	exer=mat.exp
-    	if(exer!=0):
+    	if(exer!=0 and verbose):
     		print("fill",mat.fill)
     		pcte=mat.exp/round_mas
     		rdxdens=mat.density/1600
@@ -670,542 +812,85 @@ def dopen(mat):
     	th=armor.thermalpenexp(round_energy,mat.exp)
     	depth=th
     	depth=depth/mult
-    	lethalcalc(armor,round_energy,exer)
-    	lenn=getsteel().getbarrellen(mat,mat.getroundlenmass(round_mas,round_diameter),rspeed,round_diameter)
+    	leth=lethalcalc(armor,round_energy,exer)
+    	lenn=matref("steel").getbarrellen(mat,mat.getroundlenmass(round_mas,round_diameter),rspeed,round_diameter)
+    	return {"diameter":float(round_diameter),"speed":float(rspeed),"mass":float(round_mas),
+    		"energy":float(round_energy),"pen":float(depth),"barrel":float(lenn),"lethal":float(leth)}
+
+def dopen(mat):
+    	return dopenr(mat,verbose=True)
+
+# round catalogue: material key, length/diameter, diameter (m), muzzle speed
+# (m/s, None keeps the material's own), f4 (None is getstrength()), fill,
+# explosive mass and the reference notes printed after each round
+RCOLS=("name","mat","bafac","f2","speed","f4","fill","exp","notes")
+ROUNDS=(
+    ("base","rp1tenpct",1,1,None,1,1,0,()),
+    ("2mm","steel",3.5,.27/cm_m,200,None,1,0,("barrel 7cm",)),
+    ("25acp","steel",2.5,.635/cm_m,230,None,1,0,("barrel 9.8cm",)),
+    ("22long","steel",2.6,.57/cm_m,370,None,1,0,("barrel 38cm",)),
+    ("9mm","steel",2,.9/cm_m,376,None,1,0,("19mm drop in .5mpa clay is .01mm steel. 2000x clay steel ratio is .15mm for 30cm clay.","barrel 11.4cm")),
+    ("44","steel",3,1.09/cm_m,470,None,1,0,("actual .5","barrel 12.5cm")),
+    ("556","steel",8.1,.556/cm_m,994,None,1,0,("actual 1.5 (scaled from magnun).","barrel 50.8cm")),
+    ("762","steel",6.7,.762/cm_m,856,None,1,0,("actual 1.5 (scaled from magnum) ","barrel 41.5cm")),
+    ("3006","steel",8.25,.762/cm_m,890,None,1,0,("actual 1.5 (scaled from mangum","barrel 60cm")),
+    ("50cal","steel",7.8,1.27/cm_m,860,None,.5,.005,("actual 2.3","barrel 51cm")),
+    ("m919","du",14,2.5/3/cm_m,1385,None,.85,0,("actual 10.1","barrel 106.7 cm")),
+    ("37mmm4","steel",3.08,3.7/cm_m,610,None,.91,0.05,("actual 3.5cm","barrel 198cm")),
+    ("40mmbofor","steel",3.775,4/cm_m,860,None,.6,.1,("actual 6.9cm","barrel 225cm")),
+    ("m1937","steel",3.82,4.5/cm_m,760,None,.66,.254/2,("actual 9.4cm","barrel 207cm")),
+    ("s60","steel",3.6,5.7/cm_m,1000,None,.69,0,("actual 10.6cm","barrel 440cm")),
+    ("m72","steel",3.12,7.5/cm_m,618,None,.78,0,("actual 10.9cm","barrel 292cm")),
+    ("m93","steel",3.53,7.62/cm_m,1036,None,.44,0,("actual 23.9cm","barrel 340cm")),
+    ("d48","steel",3.02,8.5/cm_m,1040,None,.43,0,("actual 19.5cm","barrel 629cm")),
+    ("bs3","steel",4.1,10/cm_m,887,None,.62,0,("actual 20cm","barrel 534cm")),
+    ("sherman","steel",7.07,7.6/cm_m,792,None,.5,0,("actual 23.9","barrel 304.8cm")),
+    ("88","steel",3.8,8.8/cm_m,773,None,.59,0,("actual 17","barrel 493.8 cm")),
+    ("122","steel",3.28,12.2/cm_m,780,None,.5,0,("actual 17","barrel 276.94 cm")),
+    ("m833","du",17.7,2.46/cm_m,1494,None,1,0,("actual 37cm","barrel 546cm")),
+    ("m900","du",71.1/2.31,2.31/cm_m,1505,None,1,0,("actual 50cm","barrel 546cm")),
+    ("3bm8","steel",4.05,5.5/cm_m,1415*.85,None,1,0,("actual 29cm","barrel 535cm")),
+    ("br412","steel",3.26,10/cm_m,895*.93,None,.78,0,("actual 15cm","barrel 535cm")),
+    ("3vmb3","steel",10,4.1/cm_m,1800*.85,None,1,0,("actual 25cm","barrel 600cm")),
+    ("3bm7","steel",12,3.6/cm_m,1785,None,1,0,("actual 40cm","barrel 600cm")),
+    ("3vbm17","du",17,3.1/cm_m,1700*.85,None,.63,0,("actual 52cm","barrel 600cm")),
+    ("svinets","du",21.84,2.5/cm_m,1700*.85,None,.88,0,("actual 66cm","barrel 600cm")),
+    ("3bm59_60","du",28.18,2.2/cm_m,1660*.85,None,1,0,("actual 66cm","barrel 600cm")),
+    ("tapna","du",29,2.5/cm_m,1690,None,2/3,0,("actual 63cm","barrel 600cm")),
+    ("m829","du",35.68,2.5/cm_m,1555,None,1,0,("actual 71cm","barrel 530cm")),
+    ("140mm","du",32,2.95/cm_m,1700,None,.55,0,("actual 80cm","barrel 658cm")),
+    ("5","steel",5.35,12.7/cm_m,790,None,.33,0,("actual 13cm","barrel 475cm")),
+    ("6","steel",4.5,15/cm_m,640,None,.5,2.6/2,("actual 30cm","barrel 750cm")),
+    ("8","steel",4.06,20/cm_m,823,None,.5,0,("actual 40cm","barrel 800cm")),
+    ("16","steel",4.5,41/cm_m,762,None,.5,0,("actual 75cm","barrel 2020 cm")),
+    ("gust","steel",3,80/cm_m,720,None,.75,0,("barrel 3250cm",)),
+    ("harp","steel",.437,.41,2164,None,1,0,("barrel 5400cm",)),
+    ("bab","steel",(544/7850),1.01,3600,None,1,0,("barrel 15600cm",)),
+    ("steel","du",1,1,None,1,1,0,()),
+)
+
+def mkround(r):
+    	# fresh material set up for one catalogue row, nothing shared
+    	r=dict(zip(RCOLS,r))
+    	mat=getmat(r["mat"])
+    	speed=getspeed(mat)
+    	mat.bafac=r["bafac"]
+    	mat.f2=r["f2"]
+    	if r["speed"] is not None:
+    		mat.f3=speed/r["speed"]
+    	mat.f4=getstrength() if r["f4"] is None else r["f4"]
+    	mat.fill=r["fill"]
+    	mat.exp=r["exp"]
+    	return mat
+
+def getround(name):
+    	for r in ROUNDS:
+    		if r[0]==name:
+    			return r
+    	raise KeyError(name)
 
 if __name__ == "__main__":   
-    
-    
-    def do2mm():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=3.5
-    	cf.f2=.27/cm_m
-    	cf.f3=speed/200
-    	cf.f4=strength
-    	dopen(cf)
-    	print("barrel 7cm")
-    	
-    	
-    def do25acp():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=2.5
-    	cf.f2=.635/cm_m
-    	cf.f3=speed/230
-    	cf.f4=strength
-    	dopen(cf)
-    	print("barrel 9.8cm")
-    
-    def do22long():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=2.6
-    	cf.f2=.57/cm_m
-    	cf.f3=speed/370
-    	cf.f4=strength
-    	dopen(cf)
-    	print("barrel 38cm")
-    
-    def do9mm():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=2
-    	cf.f2=.9/cm_m
-    	cf.f3=speed/376
-    	cf.f4=strength
-    	dopen(cf)
-    	print("19mm drop in .5mpa clay is .01mm steel. 2000x clay steel ratio is .15mm for 30cm clay.")
-    	print("barrel 11.4cm")
-    	
-    def do44():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=3
-    	cf.f2=1.09/cm_m
-    	cf.f3=speed/470
-    	cf.f4=strength
-    	dopen(cf)
-    	print("actual .5")
-    	print("barrel 12.5cm")
-    
-    def do556():
-    	cf=steel
-    	speed=getspeed(cf)	
-    	cf.bafac=8.1
-    	cf.f2=.556/cm_m
-    	cf.f3=speed/994
-    	cf.f4=strength
-    	dopen(cf)
-    	print("actual 1.5 (scaled from magnun).")
-    	print("barrel 50.8cm")
-    	
-    def do762():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=6.7
-    	cf.f2=.762/cm_m
-    	cf.f3=speed/856
-    	cf.f4=strength
-    	dopen(cf)
-    	print("actual 1.5 (scaled from magnum) ")
-    	print("barrel 41.5cm")
-    	
-    def do3006():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=8.25
-    	cf.f2=.762/cm_m
-    	cf.f3=speed/890
-    	cf.f4=strength
-    	dopen(cf)
-    	print("actual 1.5 (scaled from mangum")
-    	print("barrel 60cm")
-    	
-    	
-    def do50cal():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=7.8
-    	cf.f2=1.27/cm_m
-    	cf.f3=speed/(860)
-    	cf.f4=strength
-    	cf.fill=.5
-    	cf.exp=.005
-    	dopen(cf)
-    	cf.exp=0
-    	print("actual 2.3")
-    	print("barrel 51cm")
-    	
-    def dom919():
-    	cf=du
-    	speed=getspeed(cf)
-    	cf.bafac=14
-    	cf.f2=2.5/3/cm_m
-    	cf.f3=speed/1385
-    	cf.f4=strength
-    	cf.fill=.85
-    	dopen(cf)
-    	print("actual 10.1")
-    	print("barrel 106.7 cm")
-    	
-    def do37mmm4():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=3.08
-    	cf.f2=3.7/cm_m
-    	cf.f3=speed/(610)
-    	cf.f4=strength
-    	cf.fill=.91
-    	cf.exp=0.05
-    	dopen(cf)
-    	cf.exp=0
-    	print("actual 3.5cm")
-    	print("barrel 198cm")
-    
-    def do40mmbofor():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=3.775
-    	cf.f2=4/cm_m
-    	cf.f3=speed/(860)
-    	cf.f4=strength
-    	cf.fill=.6
-    	cf.exp=.1
-    	dopen(cf)
-    	cf.exp=0
-    	print("actual 6.9cm")
-    	print("barrel 225cm")
-    	
-    def dom1937():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=3.82
-    	cf.f2=4.5/cm_m
-    	cf.f3=speed/(760)
-    	cf.f4=strength
-    	cf.fill=.66
-    	cf.exp=.254/2
-    	dopen(cf)
-    	print("actual 9.4cm")
-    	print("barrel 207cm")
-    	cf.exp=0
-    	
-    def dos60():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=3.6
-    	cf.f2=5.7/cm_m
-    	cf.f3=speed/(1000)
-    	cf.f4=strength
-    	cf.fill=.69
-    	dopen(cf)
-    	print("actual 10.6cm")
-    	print("barrel 440cm")
-    	
-    def dom72():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=3.12
-    	cf.f2=7.5/cm_m
-    	cf.f3=speed/(618)
-    	cf.f4=strength
-    	cf.fill=.78
-    	dopen(cf)
-    	print("actual 10.9cm")
-    	print("barrel 292cm")
-    	
-    def dom93():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=3.53
-    	cf.f2=7.62/cm_m
-    	cf.f3=speed/(1036)
-    	cf.f4=strength
-    	cf.fill=.44
-    	dopen(cf)
-    	print("actual 23.9cm")
-    	print("barrel 340cm")
-    	
-    def dod48():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=3.02
-    	cf.f2=8.5/cm_m
-    	cf.f3=speed/(1040)
-    	cf.f4=strength
-    	cf.fill=.43
-    	dopen(cf)
-    	print("actual 19.5cm")
-    	print("barrel 629cm")
-    	
-    def dobs3():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=4.1
-    	cf.f2=10/cm_m
-    	cf.f3=speed/(887)
-    	cf.f4=strength
-    	cf.fill=.62
-    	dopen(cf)
-    	print("actual 20cm")
-    	print("barrel 534cm")
-    	
-    def dosherman():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=7.07
-    	cf.f2=7.6/cm_m
-    	cf.f3=speed/(792)
-    	cf.f4=strength
-    	cf.fill=.5
-    	dopen(cf)
-    	print("actual 23.9")
-    	print("barrel 304.8cm")
-    
-    def do88():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=3.8
-    	cf.f2=8.8/cm_m
-    	cf.f3=speed/773
-    	cf.f4=strength
-    	cf.fill=.59#type 18
-    	dopen(cf)  	
-    	print("actual 17")
-    	print("barrel 493.8 cm")
-    	
-    def do122():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=3.28
-    	cf.f2=12.2/cm_m
-    	cf.f3=speed/780
-    	cf.f4=strength
-    	cf.fill=.5
-    	dopen(cf)
-    	print("actual 17")
-    	print("barrel 276.94 cm")
-    	
-    def dom833():
-    	cf=du
-    	speed=getspeed(cf)
-    	cf.bafac=17.7
-    	cf.f2=2.46/cm_m
-    	cf.f3=speed/1494
-    	cf.f4=strength
-    	cf.fill=1
-    	dopen(cf)
-    	print("actual 37cm")
-    	print("barrel 546cm")
-    
-    def dom900():
-    	cf=du
-    	speed=getspeed(cf)
-    	cf.bafac=71.1/2.31
-    	cf.f2=2.31/cm_m
-    	cf.f3=speed/1505
-    	cf.f4=strength
-    	cf.fill=1
-    	dopen(cf)
-    	print("actual 50cm")
-    	print("barrel 546cm")
-    	
-    def dobr412():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=3.26
-    	cf.f2=10/cm_m
-    	cf.f3=speed/(895*.93)
-    	cf.f4=strength
-    	cf.fill=.78
-    	dopen(cf)
-    	print("actual 15cm")
-    	print("barrel 535cm")
-    	
-    def do3bm8():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=4.05
-    	cf.f2=5.5/cm_m
-    	cf.f3=speed/(1415*.85)
-    	cf.f4=strength
-    	cf.fill=1
-    	dopen(cf)
-    	print("actual 29cm")
-    	print("barrel 535cm")
-    	
-    def do3vmb3():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=10
-    	cf.f2=4.1/cm_m
-    	cf.f3=speed/(1800*.85)
-    	cf.f4=strength
-    	cf.fill=1
-    	dopen(cf)	
-    	print("actual 25cm")
-    	print("barrel 600cm")
-    	
-    def do3bm7():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=12
-    	cf.f2=3.6/cm_m
-    	cf.f3=speed/(1785)
-    	cf.f4=strength
-    	cf.fill=1
-    	dopen(cf)
-    	print("actual 40cm")
-    	print("barrel 600cm")
-    	
-    def do3vbm17():
-    	cf=du
-    	speed=getspeed(cf)
-    	cf.bafac=17
-    	cf.f2=3.1/cm_m
-    	cf.f3=speed/(1700*.85)
-    	cf.f4=strength
-    	cf.fill=.63
-    	dopen(cf)
-    	print("actual 52cm")
-    	print("barrel 600cm")
-    	
-    def dosvinets():
-    	cf=du
-    	speed=getspeed(cf)
-    	cf.bafac=21.84
-    	cf.f2=2.5/cm_m
-    	cf.f3=speed/(1700*.85)
-    	cf.f4=strength
-    	cf.fill=.88
-    	dopen(cf)
-    	print("actual 66cm")
-    	print("barrel 600cm")
-    	
-    def do3bm59_60():
-    	cf=du
-    	speed=getspeed(cf)
-    	cf.bafac=28.18
-    	cf.f2=2.2/cm_m
-    	cf.f3=speed/(1660*.85)
-    	cf.f4=strength
-    	cf.fill=1
-    	dopen(cf)
-    	print("actual 66cm")
-    	print("barrel 600cm")
-    	
-    def dotapna():
-    	cf=du
-    	speed=getspeed(cf)
-    	cf.bafac=29
-    	cf.f2=2.5/cm_m
-    	cf.f3=speed/1690
-    	cf.f4=strength
-    	cf.fill=2/3
-    	dopen(cf)
-    	print("actual 63cm")
-    	print("barrel 600cm")
-    	
-    def dom829():
-    	cf=du
-    	speed=getspeed(cf)
-    	cf.bafac=35.68
-    	cf.f2=2.5/cm_m
-    	cf.f3=speed/1555
-    	cf.f4=strength
-    	cf.fill=1
-    	dopen(cf)
-    	print("actual 71cm")
-    	print("barrel 530cm")
-    	
-    def do140mm():
-    	cf=du
-    	speed=getspeed(cf)
-    	cf.bafac=32
-    	cf.f2=2.95/cm_m
-    	cf.f3=speed/1700
-    	cf.f4=strength
-    	cf.fill=.55
-    	dopen(cf)
-    	print("actual 80cm")
-    	print("barrel 658cm")
-    	
-    def do5():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=5.35
-    	cf.f2=12.7/cm_m
-    	cf.f3=speed/790
-    	cf.f4=strength
-    	cf.fill=.33
-    	dopen(cf)
-    	print("actual 13cm")
-    	print("barrel 475cm")
-    	
-    def do6():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=4.5
-    	cf.f2=15/cm_m
-    	cf.f3=speed/640
-    	cf.f4=strength
-    	cf.fill=.5
-    	cf.exp=2.6/2
-    	dopen(cf)
-    	cf.exp=0
-    	print("actual 30cm")
-    	print("barrel 750cm")
-    	
-    def do8():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=4.06
-    	cf.f2=20/cm_m
-    	cf.f3=speed/(823)
-    	cf.f4=strength
-    	cf.fill=.5
-    	dopen(cf)
-    	print("actual 40cm")
-    	print("barrel 800cm")
-    	
-    def do16():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=4.5
-    	cf.f2=41/cm_m
-    	cf.f3=speed/762
-    	cf.f4=strength
-    	cf.fill=.5
-    	dopen(cf)
-    	print("actual 75cm")
-    	print("barrel 2020 cm")
-    
-    def dogust():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=3
-    	cf.f2=80/cm_m
-    	cf.f3=speed/720
-    	cf.f4=strength
-    	cf.fill=.75
-    	dopen(cf)
-    	print("barrel 3250cm")
-    	
-    def doharp():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=.437
-    	cf.f2=.41
-    	cf.f3=speed/2164
-    	cf.f4=strength
-    	cf.fill=1
-    	dopen(cf)
-    	print("barrel 5400cm")
-    	
-    def dobab():
-    	cf=steel
-    	speed=getspeed(cf)
-    	cf.bafac=(544/7850)
-    	cf.f2=1.01
-    	cf.f3=speed/3600
-    	cf.f4=strength
-    	cf.fill=1
-    	dopen(cf)
-    	print("barrel 15600cm")
-    	
-    	
-    def dosteel():
-    	cf=du
-    	cf.bafac=1
-    	cf.f2=1
-    	cf.f3=1
-    	cf.f4=1
-    	cf.fill=1
-    	dopen(cf)
-    	
-    
-    	    
-    dopen(cf)
-    do2mm()
-    do25acp()
-    do22long()
-    do9mm()
-    do44()
-    do556()
-    do762()
-    do3006()
-    do50cal()
-    dom919()
-    do37mmm4()
-    do40mmbofor()
-    dom1937()
-    dos60()
-    dom72()
-    dom93()
-    dod48()
-    dobs3()
-    dosherman()
-    do88()
-    do122()
-    dom833()
-    dom900()
-    do3bm8()
-    dobr412()
-    do3vmb3()
-    do3bm7()
-    do3vbm17()
-    dosvinets()
-    do3bm59_60()
-    dotapna()
-    dom829()
-    do140mm()
-    do5()
-    do6()
-    do8()
-    do16()
-    dogust()
-    doharp()
-    dobab()
-    dosteel()
-    
+    for r in ROUNDS:
+    	dopen(mkround(r))
+    	for s in r[-1]:
+    		print(s)
@@ -5,47 +5,52 @@ from matplotlib.colors import LogNorm
 import re
 import os
 import tkinter as tk
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+import tkbin
+import lod
+from hmap import hmap
 
 # ------------------------------
 # Files
 # ------------------------------
-terrain_file = "f.json"
-movement_file = "f2.json"
+terrain_file = "f.tkh"
+movement_file = "f2.tkt"
+legacy_terrain_file = "f.json"
+legacy_movement_file = "f2.json"
+pyramid_file = terrain_file + ".lod"
 shot_file = "f3.json"  # optional
 
 # ------------------------------
 # Load terrain
 # ------------------------------
-with open(terrain_file, "r") as f:
-    terrain_raw = json.load(f)
+def load_terrain():
+    if os.path.exists(terrain_file):
+        return tkbin.loadhm(terrain_file)
+    with open(legacy_terrain_file, "r") as f:
+        raw = json.load(f)
+    keys = sorted(int(k) for k in raw if int(k) >= 0)
+    rr = min(b - a for a, b in zip(keys, keys[1:])) if len(keys) > 1 else 1
+    return hmap.fromdict(raw, rr)
 
-terrain_sparse = {}
-max_i = 0
-max_j = 0
-for i_str, row in terrain_raw.items():
-    i = int(i_str)
-    max_i = max(max_i, i)
-    for j_str, h in row.items():
-        j = int(j_str)
-        max_j = max(max_j, j)
-        terrain_sparse.setdefault(i, {})[j] = h
-max_i += 1
-max_j += 1
+terrain = load_terrain()
+max_i = terrain.maxx() + 1
+max_j = terrain.maxy() + 1
 
 # ------------------------------
 # Load tank movements
 # ------------------------------
-with open(movement_file, "r") as f:
-    movements_raw = f.read()
-pattern = r"\|(\d+)\s+tank\s+moved\s+to\s+(\d+),(\d+)"
-matches = re.findall(pattern, movements_raw)
+def load_paths():
+    if os.path.exists(movement_file):
+        return tkbin.paths(tkbin.loadtr(movement_file))
+    with open(legacy_movement_file, "r") as f:
+        movements_raw = f.read()
+    pattern = r"\|(\d+)\s+tank\s+moved\s+to\s+(\d+),(\d+)"
+    paths = {}
+    for (tank_id, x_str, y_str) in re.findall(pattern, movements_raw):
+        paths.setdefault(int(tank_id), []).append((int(x_str), int(y_str)))
+    return paths
 
-tank_paths = {}
-for (tank_id, x_str, y_str) in matches:
-    tank_id = int(tank_id)
-    x, y = int(x_str), int(y_str)
-    tank_paths.setdefault(tank_id, []).append((x, y))
+tank_paths = load_paths()
 
 # ------------------------------
 # Load optional shots
@@ -60,45 +65,23 @@ if os.path.exists(shot_file):
 # ------------------------------
 # Display parameters
 # ------------------------------
-screen_rows, screen_cols = 400, 400
-rows_factor = max(1, max_i // screen_rows)
-cols_factor = max(1, max_j // screen_cols)
-display_rows = (max_i + rows_factor - 1)//rows_factor
-display_cols = (max_j + cols_factor - 1)//cols_factor
-scale_x = display_rows / max_i
-scale_y = display_cols / max_j
-
-# ------------------------------
-# Fast zero-fill for sparse display
-# ------------------------------
-def fill_display(sparse_dict, shape, factor_rows, factor_cols):
-    display = np.zeros(shape, dtype=np.float32)
-    for i, row in sparse_dict.items():
-        di = i // factor_rows
-        if di >= shape[0]: continue
-        for j, h in row.items():
-            dj = j // factor_cols
-            if dj >= shape[1]: continue
-            display[di, dj] = h
-    # propagate last known value row-wise
-    for i in range(shape[0]):
-        last = 1e-6
-        for j in range(shape[1]):
-            if display[i,j]==0:
-                display[i,j]=last
-            else:
-                last = display[i,j]
-    # propagate last known value column-wise
-    for j in range(shape[1]):
-        last = 1e-6
-        for i in range(shape[0]):
-            if display[i,j]==0:
-                display[i,j]=last
-            else:
-                last = display[i,j]
-    return np.maximum(display,1e-6)
-
-display_terrain = fill_display(terrain_sparse, (display_rows, display_cols), rows_factor, cols_factor)
+# everything is drawn in world units; the terrain image is refetched from
+# the level of detail pyramid at about screen_px cells across the view
+screen_px = 400
+scale_x = scale_y = 1
+pool = "mean"
+
+# ------------------------------
+# Terrain tiles at the zoom level the view needs
+# ------------------------------
+levels = lod.pyramid(terrain, pyramid_file, pool, terrain_file) if os.path.exists(terrain_file) else lod.pyramid(terrain, None, pool)
+terrain_tiles = lod.tiles(levels, terrain.rr)
+
+def fetch_display(x0, x1, y0, y1):
+    display, extent = terrain_tiles.view(x0, x1, y0, y1, screen_px)
+    return np.maximum(display, 1e-6), extent
+
+display_terrain, display_extent = fetch_display(0, max_i, 0, max_j)
 
 # ------------------------------
 # Tkinter main window
@@ -108,23 +91,51 @@ root.title("Game Visualization")
 
 fig, ax = plt.subplots(figsize=(6,6))
 canvas = FigureCanvasTkAgg(fig, master=root)
+toolbar = NavigationToolbar2Tk(canvas, root)
+toolbar.update()
 canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=1)
 
 im = ax.imshow(display_terrain.T, origin='lower', cmap='terrain',
-               interpolation='nearest',
+               interpolation='nearest', extent=display_extent,
                norm=LogNorm(vmin=np.min(display_terrain), vmax=np.max(display_terrain)))
 plt.colorbar(im, ax=ax, label="Height (log scale)")
+# the refetched image must not move the limits that asked for it
+ax.set_autoscale_on(False)
+
+# a pan or zoom moves both limits; refetch once after both have changed
+zoom_pending = False
+
+def refetch():
+    global zoom_pending
+    zoom_pending = False
+    (x0, x1), (y0, y1) = ax.get_xlim(), ax.get_ylim()
+    display, extent = fetch_display(min(x0, x1), max(x0, x1), min(y0, y1), max(y0, y1))
+    im.set_data(display.T)
+    im.set_extent(extent)
+    canvas.draw_idle()
+
+def on_zoom(axes):
+    global zoom_pending
+    if not zoom_pending:
+        zoom_pending = True
+        root.after_idle(refetch)
+
+ax.callbacks.connect('xlim_changed', on_zoom)
+ax.callbacks.connect('ylim_changed', on_zoom)
 
 # ------------------------------
 # Tank visualization
 # ------------------------------
+# each path as one float32 array, frames only slice into it
 colors = ['red','blue','yellow','cyan','magenta','orange','green','purple']
+tank_traj = {tank_id: np.asarray(path, dtype=np.float32).reshape(-1, 2) * (scale_x, scale_y)
+             for tank_id, path in tank_paths.items()}
 tank_lines = {}
 tank_dots = {}
 trail_length = 20
 for idx, tank_id in enumerate(sorted(tank_paths.keys())):
-    line, = ax.plot([],[], color=colors[idx%len(colors)], label=f"Tank {tank_id}", linewidth=2)
-    dot, = ax.plot([],[], 'o', color=colors[idx%len(colors)], markersize=6)
+    line, = ax.plot([],[], color=colors[idx%len(colors)], label=f"Tank {tank_id}", linewidth=2, animated=True)
+    dot, = ax.plot([],[], 'o', color=colors[idx%len(colors)], markersize=6, animated=True)
     tank_lines[tank_id] = line
     tank_dots[tank_id] = dot
 
@@ -143,56 +154,81 @@ if permanent_shots:
                         color="black", linewidth=1, linestyle="--")
         shot_markers.append(line)
 
+max_steps = max(len(path) for path in tank_paths.values())
+
+# frame -> shots that flash on it: a tank at path[min(frame, len-1)] within
+# proximity_radius of the shot's end point, worked out once per shot
+flash_at = {}
+if not permanent_shots:
+    for si, (x1,y1,x2,y2) in enumerate(shots):
+        for path in tank_paths.values():
+            p = np.asarray(path, dtype=np.float64).reshape(-1, 2)
+            if len(p)==0: continue
+            near = np.hypot(p[:,0]-x2, p[:,1]-y2) <= proximity_radius
+            frames = list(np.nonzero(near)[0])
+            if near[-1]:
+                frames += range(len(p), max_steps+1)
+            for fr in frames:
+                flash_at.setdefault(int(fr), []).append(si)
+
 # ------------------------------
 # Clock
 # ------------------------------
 clock_text = ax.text(0.02,0.95,"", transform=ax.transAxes, fontsize=12,
-                     verticalalignment='top',
+                     verticalalignment='top', animated=True,
                      bbox=dict(boxstyle="round", facecolor="white", alpha=0.7))
 
 # ------------------------------
 # Axes setup
 # ------------------------------
-ax.set_xlim(0, display_rows)
-ax.set_ylim(0, display_cols)
+ax.set_xlim(0, max_i)
+ax.set_ylim(0, max_j)
 ax.set_title("Top-down game view")
 ax.set_xlabel("X")
 ax.set_ylabel("Y")
 ax.legend()
 
-max_steps = max(len(path) for path in tank_paths.values())
+# ------------------------------
+# Blitting: the terrain, shots and axes are drawn once into a cached
+# background; a frame restores it and draws only the animated artists
+# ------------------------------
+background = None
+
+def on_draw(event):
+    global background
+    background = canvas.copy_from_bbox(fig.bbox)
+    draw_animated()
+
+canvas.mpl_connect('draw_event', on_draw)
+
+def draw_animated():
+    for artist in list(tank_lines.values()) + list(tank_dots.values()) + [clock_text]:
+        ax.draw_artist(artist)
+    for line, _ in active_flashes:
+        ax.draw_artist(line)
 
 # ------------------------------
 # Update function
 # ------------------------------
 def update_frame(frame):
-    for tank_id, path in tank_paths.items():
-        current_step = min(frame, len(path))
+    for tank_id, coords in tank_traj.items():
+        current_step = min(frame, len(coords))
         if current_step>0:
-            coords = np.array(path[:current_step], dtype=np.float32)
-            coords[:,0] *= scale_x
-            coords[:,1] *= scale_y
-            tank_lines[tank_id].set_data(coords[:,0], coords[:,1])
-            start_idx = max(0, current_step-trail_length)
-            tail_coords = np.array(path[start_idx:current_step], dtype=np.float32)
-            tail_coords[:,0] *= scale_x
-            tail_coords[:,1] *= scale_y
-            if len(tail_coords)>0:
-                tank_dots[tank_id].set_data([tail_coords[-1,0]], [tail_coords[-1,1]])
+            tank_lines[tank_id].set_data(coords[:current_step,0], coords[:current_step,1])
+            tank_dots[tank_id].set_data(coords[current_step-1:current_step,0], coords[current_step-1:current_step,1])
+        else:
+            tank_lines[tank_id].set_data([], [])
+            tank_dots[tank_id].set_data([], [])
 
     clock_text.set_text(f"Time step: {frame}")
 
     # Temporary hit flashes
-    if not permanent_shots:
-        for (x1,y1,x2,y2) in shots:
-            for path in tank_paths.values():
-                if len(path)==0: continue
-                tank_pos = path[min(frame,len(path)-1)]
-                if np.hypot(tank_pos[0]-x2, tank_pos[1]-y2)<=proximity_radius:
-                    active_flashes.append((ax.plot([x1*scale_x, x2*scale_x],
-                                                   [y1*scale_y, y2*scale_y],
-                                                   color="black", linewidth=1, linestyle="--")[0],
-                                          flash_duration))
+    for si in flash_at.get(frame, ()):
+        x1,y1,x2,y2 = shots[si]
+        active_flashes.append((ax.plot([x1*scale_x, x2*scale_x],
+                                       [y1*scale_y, y2*scale_y],
+                                       color="black", linewidth=1, linestyle="--", animated=True)[0],
+                              flash_duration))
     # Update flash timers
     for flash in active_flashes[:]:
         line, remaining = flash
@@ -206,7 +242,12 @@ def update_frame(frame):
             idx = active_flashes.index(flash)
             active_flashes[idx] = (line, remaining)
 
-    canvas.draw_idle()
+    if background is None:
+        canvas.draw_idle()
+        return
+    canvas.restore_region(background)
+    draw_animated()
+    canvas.blit(fig.bbox)
 
 # ------------------------------
 # Slider
@@ -239,4 +280,4 @@ if auto_play:
 # ------------------------------
 # Start Tkinter loop
 # ------------------------------
-root.mainloop()
\ No newline at end of file
+root.mainloop()
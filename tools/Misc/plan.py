@@ -0,0 +1,122 @@
+import heapq
+import math
+import tempfile
+import numpy as np
+import hmap
+
+# 8 neighbour steps in heightmap cells, bit k of a pass mask is DIRS[k]
+DIRS = ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1))
+SQ2 = math.sqrt(2)
+# node expansions before astar gives up and the caller falls back
+LIM = 1 << 20
+
+def passm(hm, tf, fn=None):
+    """uint8 pass mask over the heightmap cells, as a memmap.
+
+    Bit k is set when a hull may step from the cell to its DIRS[k]
+    neighbour: the neighbour is in bounds and (h[next]-h)*.5 <= tf, the
+    same slope rule as tankin.torc.
+
+    Unit steps from a cell corner cross both cell edges at once on the
+    (1,1) and (-1,-1) diagonals, but (1,-1) and (-1,1) pass through the
+    side cell first, so those two bits are the two legs through it.
+
+    Built over hmap.blocks of rows with a one row halo, so the temporaries
+    stay block sized; the mask goes to fn, or an unnamed temporary file."""
+    h = hm.h
+    nx, ny = h.shape
+    m = np.memmap(fn if fn is not None else tempfile.TemporaryFile(), dtype=np.uint8,
+                  mode="w+", shape=(nx, ny))
+    for i0, i1 in hmap.blocks(nx, ny):
+        lo = max(0, i0 - 1)
+        m[i0:i1] = bits(h[lo:min(nx, i1 + 1)], tf)[i0 - lo:i1 - lo]
+    m.flush()
+    return m
+
+def bits(h, tf):
+    # passm over a slab of rows; its first and last rows see the slab edge
+    # as the grid edge, so callers keep only the inner rows
+    nx, ny = h.shape
+    ok = []
+    for di, dj in DIRS:
+        a = (slice(max(0, -di), nx - max(0, di)), slice(max(0, -dj), ny - max(0, dj)))
+        b = (slice(max(0, di), nx + min(0, di)), slice(max(0, dj), ny + min(0, dj)))
+        o = np.zeros((nx, ny), dtype=bool)
+        o[a] = (h[b].astype(np.float64) - h[a]) * .5 <= tf
+        ok.append(o)
+    # (1,-1) goes via (i,j-1), (-1,1) via (i-1,j)
+    ok[7] = ok[6].copy()
+    ok[7][:, 1:] &= ok[0][:, :-1]
+    ok[3] = ok[4].copy()
+    ok[3][1:] &= ok[2][:-1]
+    m = np.zeros((nx, ny), dtype=np.uint8)
+    for k, o in enumerate(ok):
+        m |= o.astype(np.uint8) << k
+    return m
+
+def octile(a, b):
+    di = abs(a[0] - b[0])
+    dj = abs(a[1] - b[1])
+    return max(di, dj) + (SQ2 - 1) * min(di, dj)
+
+def astar(m, s, g, lim=LIM):
+    """Cell path from s to g (both included) over pass mask m, or None.
+
+    Straight steps cost 1 and diagonals sqrt(2), so the octile distance is
+    an exact lower bound; ties go to the deeper node to keep open ground
+    from flooding."""
+    if s == g:
+        return [s]
+    best = {s: 0.0}
+    prev = {s: None}
+    q = [(octile(s, g), 0.0, s)]
+    n = 0
+    while q:
+        _, c, p = heapq.heappop(q)
+        c = -c
+        if p == g:
+            break
+        if c > best[p]:
+            continue
+        n += 1
+        if n > lim:
+            return None
+        i, j = p
+        bits = int(m[i, j])
+        for k, (di, dj) in enumerate(DIRS):
+            if not bits >> k & 1:
+                continue
+            nb = (i + di, j + dj)
+            nc = c + (SQ2 if di and dj else 1.0)
+            if nc < best.get(nb, math.inf):
+                best[nb] = nc
+                prev[nb] = p
+                heapq.heappush(q, (nc + octile(nb, g), -nc, nb))
+    else:
+        return None
+    path = []
+    while p is not None:
+        path.append(p)
+        p = prev[p]
+    path.reverse()
+    return path
+
+class plans:
+    """Per goal cache of planned cell paths.
+
+    Every cell of a stored path maps to its index, so a later request
+    starting anywhere on that path reuses the tail instead of searching
+    again. Tanks of one team start in the same cell and share one search."""
+    def __init__(self, m):
+        self.m = m
+        self.done = {}
+
+    def get(self, s, g):
+        for path, at in self.done.get(g, ()):
+            if s in at:
+                return path[at[s]:]
+        path = astar(self.m, s, g)
+        if path is not None:
+            at = {c: i for i, c in enumerate(path)}
+            self.done.setdefault(g, []).append((path, at))
+        return path
@@ -0,0 +1,80 @@
+import math
+
+class sgrid:
+    """Uniform grid of unit keys by position.
+
+    Cells are cs world units square. Moving a unit only touches the grid
+    when it crosses into another cell, and a radius query visits the cells
+    under the circle or, when that would be more, just the occupied ones."""
+    def __init__(self, cs):
+        self.cs = cs
+        self.cells = {}
+        self.pos = {}
+        self.at = {}
+
+    def cell(self, x, y):
+        return (int(x // self.cs), int(y // self.cs))
+
+    def add(self, k, x, y):
+        c = self.cell(x, y)
+        self.cells.setdefault(c, set()).add(k)
+        self.pos[k] = (x, y)
+        self.at[k] = c
+
+    def remove(self, k):
+        c = self.at.pop(k)
+        del self.pos[k]
+        s = self.cells[c]
+        s.discard(k)
+        if not s:
+            del self.cells[c]
+
+    def move(self, k, x, y):
+        c = self.cell(x, y)
+        self.pos[k] = (x, y)
+        if c != self.at[k]:
+            s = self.cells[self.at[k]]
+            s.discard(k)
+            if not s:
+                del self.cells[self.at[k]]
+            self.cells.setdefault(c, set()).add(k)
+            self.at[k] = c
+
+    def near(self, x, y, r):
+        """Keys within distance r of x,y."""
+        i0, j0 = self.cell(x - r, y - r)
+        i1, j1 = self.cell(x + r, y + r)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > len(self.cells):
+            cand = ((c, s) for c, s in self.cells.items() if i0 <= c[0] <= i1 and j0 <= c[1] <= j1)
+        else:
+            cand = (((i, j), self.cells[(i, j)]) for i in range(i0, i1 + 1)
+                    for j in range(j0, j1 + 1) if (i, j) in self.cells)
+        r2 = r * r
+        out = []
+        for _, s in cand:
+            for k in s:
+                px, py = self.pos[k]
+                if (px - x) ** 2 + (py - y) ** 2 <= r2:
+                    out.append(k)
+        return out
+
+    def nearest(self, x, y, keep=None, r=None):
+        """Closest key to x,y passing keep, searching out from one cell."""
+        if not self.pos:
+            return None
+        r = r or self.cs
+        while True:
+            best = None
+            ks = self.near(x, y, r)
+            for k in ks:
+                if keep is not None and not keep(k):
+                    continue
+                px, py = self.pos[k]
+                d = math.hypot(px - x, py - y)
+                if best is None or d < best[0]:
+                    best = (d, k)
+            if best is not None:
+                return best[1]
+            if len(ks) == len(self.pos):
+                return None
+            r *= 2
@@ -1,10 +1,27 @@
 # === Part 1: Imports and Utilities ===
+import bisect
+import copy
+import heapq
 import math
-import random
 import sys
 import numpy as np
+from streams import streams
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
 
 deadtargets = {}
+# random streams of the current mission, every entity takes its own by
+# name; run() replaces this with the streams of the replication it runs
+rs = streams()
+# set by run() for batch replications; say() is print unless quiet
+quiet = False
+
+def say(*a):
+    if not quiet:
+        print(*a)
 
 def angle_diff(a, b):
     """Minimal difference between two angles in degrees."""
@@ -12,13 +29,40 @@ def angle_diff(a, b):
     return diff
 
 maxtime = 600
+# a MiG23 turns to guns inside this range of its target
+dogfight_km = 5
+
+# plane geometry in km and degrees (0 along +x, counterclockwise); the
+# scalar forms serve the classes below, dists/bearings give the full
+# observer x target matrices for world.py
+def distance(p, q):
+    return math.hypot(q[0] - p[0], q[1] - p[1])
+
+def bearing(p, q):
+    return math.degrees(math.atan2(q[1] - p[1], q[0] - p[0])) % 360
+
+def advance(p, heading, speed, time_sec):
+    """p after time_sec seconds at speed km/h along heading."""
+    dist_km = speed * (time_sec / 3600)
+    rad = math.radians(heading)
+    return (p[0] + dist_km * math.cos(rad), p[1] + dist_km * math.sin(rad))
+
+def dists(a, b):
+    """(len(a), len(b)) distances between the rows of two (n, 2) arrays."""
+    d = np.asarray(b)[None, :, :] - np.asarray(a)[:, None, :]
+    return np.hypot(d[..., 0], d[..., 1])
+
+def bearings(a, b):
+    d = np.asarray(b)[None, :, :] - np.asarray(a)[:, None, :]
+    return np.degrees(np.arctan2(d[..., 1], d[..., 0])) % 360
 
 # --- Radar class ---
 class Radar:
-    def __init__(self, max_range_km=50, base_detection_prob=0.9):
+    def __init__(self, rng, max_range_km=50, base_detection_prob=0.9):
         self.max_range_km = max_range_km
         self.base_detection_prob = base_detection_prob
         self.jamming_level = 0.0
+        self.rng = rng
 
     def set_jamming_level(self, level):
         self.jamming_level = max(0.0, min(1.0, level))
@@ -35,7 +79,67 @@ class Radar:
         detection_chance *= min(2.0, rcs_factor)
         detection_chance *= (1 - self.jamming_level)
         detection_chance = max(0.0, min(1.0, detection_chance))
-        return random.random() < detection_chance
+        return self.rng.random() < detection_chance
+
+    def detect_all(self, own_positions, target_positions, target_rcs, rng=None):
+        """detections() for a set of sensors sharing this radar's settings,
+        drawing from this radar's stream unless rng is given."""
+        return detections(own_positions, target_positions, target_rcs, self.max_range_km,
+                          self.base_detection_prob, self.jamming_level,
+                          rng=self.rng if rng is None else rng)
+
+def chance(distance, rcs, max_range_km, base_detection_prob, jamming_level):
+    """Radar.detect's probability, elementwise over arrays of pairs."""
+    p = base_detection_prob * (1 - distance / max_range_km)
+    p = p * np.minimum(2.0, rcs / 5.0) * (1 - jamming_level)
+    return np.where(distance > max_range_km, 0.0, np.clip(p, 0.0, 1.0))
+
+def within(a, b, r):
+    """(i, j, d): rows j of b at most r (or r[i]) from row i of a.
+
+    Uses a KD-tree over b when scipy is there, otherwise a sweep over b
+    sorted by x so each row of a only measures the strip |dx| <= r."""
+    a = np.asarray(a, dtype=np.float64).reshape(-1, 2)
+    b = np.asarray(b, dtype=np.float64).reshape(-1, 2)
+    r = np.broadcast_to(np.asarray(r, dtype=np.float64), len(a))
+    if len(a) == 0 or len(b) == 0:
+        i = j = np.zeros(0, dtype=np.int64)
+    elif cKDTree is not None:
+        hits = cKDTree(b).query_ball_point(a, r)
+        n = np.array([len(h) for h in hits], dtype=np.int64)
+        i = np.repeat(np.arange(len(a)), n)
+        j = np.concatenate([np.asarray(h, dtype=np.int64) for h in hits])
+    else:
+        order = np.argsort(b[:, 0], kind="stable")
+        bx = b[order, 0]
+        lo = np.searchsorted(bx, a[:, 0] - r, "left")
+        n = np.searchsorted(bx, a[:, 0] + r, "right") - lo
+        i = np.repeat(np.arange(len(a)), n)
+        start = np.repeat(lo - np.concatenate(([0], np.cumsum(n)[:-1])), n)
+        j = order[start + np.arange(len(i))]
+    d = np.hypot(b[j, 0] - a[i, 0], b[j, 1] - a[i, 1])
+    keep = d <= r[i]
+    return i[keep], j[keep], d[keep]
+
+def detections(sensor_positions, target_positions, target_rcs, max_range_km,
+               base_detection_prob=0.9, jamming_level=0.0, *, rng):
+    """Every sensor against every target at once.
+
+    Sensor settings may be scalars or one value per sensor. Returns the
+    (sensors, targets) probability matrix and one sampled detection per
+    pair; pairs beyond a sensor's range are never measured or drawn. rng
+    is the caller's own stream, e.g. rs(f"{name}/radar")."""
+    ns, nt = len(sensor_positions), len(target_positions)
+    rmax = np.broadcast_to(np.asarray(max_range_km, dtype=np.float64), ns)
+    base = np.broadcast_to(np.asarray(base_detection_prob, dtype=np.float64), ns)
+    jam = np.broadcast_to(np.asarray(jamming_level, dtype=np.float64), ns)
+    i, j, d = within(sensor_positions, target_positions, rmax)
+    p = chance(d, np.asarray(target_rcs, dtype=np.float64)[j], rmax[i], base[i], jam[i])
+    P = np.zeros((ns, nt))
+    P[i, j] = p
+    seen = np.zeros((ns, nt), dtype=bool)
+    seen[i, j] = rng.random(len(p)) < p
+    return P, seen
 
 class EnemyAircraft:
     def __init__(self, eid, aircraft_type, position, heading, speed, altitude, rcs):
@@ -51,12 +155,7 @@ class EnemyAircraft:
     def update_position(self, time_sec=1.0):
         if not self.alive:
             return
-        dist_km = self.speed * (time_sec / 3600)
-        rad = math.radians(self.heading)
-        dx = dist_km * math.cos(rad)
-        dy = dist_km * math.sin(rad)
-        x, y = self.position
-        self.position = (x + dx, y + dy)
+        self.position = advance(self.position, self.heading, self.speed, time_sec)
 
     def status(self):
         x, y = self.position
@@ -65,15 +164,16 @@ class EnemyAircraft:
 def generate_random_enemies(n=5):
     enemies = []
     for i in range(n):
-        is_bomber = random.random() < 0.4
+        g = rs(f"Enemy{i+1}")
+        is_bomber = g.random() < 0.4
         enemy = EnemyAircraft(
             eid=f"Enemy{i+1}",
             aircraft_type="bomber" if is_bomber else "fighter",
-            position=(random.uniform(30, 100), random.uniform(-50, 50)),
-            heading=random.uniform(180, 360),
-            speed=random.uniform(700, 900) if is_bomber else random.uniform(1100, 1400),
-            altitude=random.uniform(8000, 13000),
-            rcs=random.uniform(8, 15) if is_bomber else random.uniform(1.5, 4.0)
+            position=(g.uniform(30, 100), g.uniform(-50, 50)),
+            heading=g.uniform(180, 360),
+            speed=g.uniform(700, 900) if is_bomber else g.uniform(1100, 1400),
+            altitude=g.uniform(8000, 13000),
+            rcs=g.uniform(8, 15) if is_bomber else g.uniform(1.5, 4.0)
         )
         enemies.append(enemy)
     return enemies
@@ -86,6 +186,7 @@ class Missile:
         self.alive = True
         self.max_turn_rate = 20  # degrees per second
         self.heading = launcher.heading
+        self.rng = rs(f"{launcher.name}/missile{launcher.weapons_fired}")
 
     def update(self, time_sec=1.0):
         if not self.alive or not self.target.alive:
@@ -102,34 +203,24 @@ class Missile:
         self.heading = (self.heading + diff) % 360
 
         # Move forward
-        dist_km = self.speed * (time_sec / 3600)
-        rad = math.radians(self.heading)
-        dx = dist_km * math.cos(rad)
-        dy = dist_km * math.sin(rad)
-        x, y = self.position
-        self.position = (x + dx, y + dy)
+        self.position = advance(self.position, self.heading, self.speed, time_sec)
 
         # Check for hit (within 0.2 km)
         if self._distance_to_point(self.target.position) < 0.2:
-            hit_chance = 0.8
-            if random.random() < hit_chance:
-                print(f"Missile from {self.launcher.name} hit {self.target.id}!")
+            if self.rng.random() < self.launcher.missile_hit_chance:
+                say(f"Missile from {self.launcher.name} hit {self.target.id}!")
                 deadtargets.setdefault(self.target.id)
                 self.target.alive = False
                 return self.target.id
             else:
-                print(f"Missile from {self.launcher.name} missed {self.target.id}.")
+                say(f"Missile from {self.launcher.name} missed {self.target.id}.")
             self.alive = False
 
     def _distance_to_point(self, point):
-        dx = point[0] - self.position[0]
-        dy = point[1] - self.position[1]
-        return math.hypot(dx, dy)
+        return distance(self.position, point)
 
     def _bearing_to_point(self, point):
-        dx = point[0] - self.position[0]
-        dy = point[1] - self.position[1]
-        return math.degrees(math.atan2(dy, dx)) % 360
+        return bearing(self.position, point)
 
 class MiG25:
     def __init__(self, name):
@@ -147,29 +238,27 @@ class MiG25:
         self.current_missile = None
         self.evasive = False
         self.evasive_time = 0
+        self.missile_hit_chance = 0.8
         self.alive=1
 
-        self.radar = Radar(max_range_km=60, base_detection_prob=0.95)
+        self.radar = Radar(rs(f"{name}/radar"), max_range_km=60, base_detection_prob=0.95)
+        self.rng = rs(name)
 
     def set_jamming(self, level):
         self.radar.set_jamming_level(level)
 
     def _distance_to_point(self, point):
-        dx = point[0] - self.position[0]
-        dy = point[1] - self.position[1]
-        return math.hypot(dx, dy)
+        return distance(self.position, point)
 
     def _bearing_to_point(self, point):
-        dx = point[0] - self.position[0]
-        dy = point[1] - self.position[1]
-        return math.degrees(math.atan2(dy, dx)) % 360
+        return bearing(self.position, point)
 
     def detect_target(self, target):
         return self.radar.detect(self.position, target.position, target.rcs)
 
     def receive_gci_command(self, target):
-        if random.random() < self.command_failure_chance:
-            print(f"{self.name} GCI command disrupted by ECM!")
+        if self.rng.random() < self.command_failure_chance:
+            say(f"{self.name} GCI command disrupted by ECM!")
             return
         self.heading = self._bearing_to_point(target.position)
 
@@ -177,17 +266,12 @@ class MiG25:
         if self.fuel <= 0:
             self.speed = 0
             self.rtb_mode = True
-            print(f"{self.name} OUT OF FUEL - Forced RTB")
+            say(f"{self.name} OUT OF FUEL - Forced RTB")
             return
         burn = self.fuel_burn_rate * time_sec * (2 if self.evasive else 1)
         self.fuel -= burn
 
-        dist_km = self.speed * (time_sec / 3600)
-        rad = math.radians(self.heading)
-        dx = dist_km * math.cos(rad)
-        dy = dist_km * math.sin(rad)
-        x, y = self.position
-        self.position = (x + dx, y + dy)
+        self.position = advance(self.position, self.heading, self.speed, time_sec)
 
         if self.evasive:
             self.evasive_time -= time_sec
@@ -202,7 +286,7 @@ class MiG25:
             return False
         self.weapons_fired += 1
         self.current_missile = Missile(self, target)
-        print(f"{self.name} launched missile at {target.id}")
+        say(f"{self.name} launched missile at {target.id}")
         self.evasive = True
         self.evasive_time = 10
         self.fuel -= 0
@@ -232,29 +316,27 @@ class MiG23:
         self.fuel_burn_rate = 40# kg/sec
         self.command_failure_chance = 0.1
         self.dogfight_mode = False
+        self.gun_hit_chance = 0.6
         self.alive=1
 
-        self.radar = Radar(max_range_km=30, base_detection_prob=0.8)
+        self.radar = Radar(rs(f"{name}/radar"), max_range_km=30, base_detection_prob=0.8)
+        self.rng = rs(name)
 
     def set_jamming(self, level):
         self.radar.set_jamming_level(level)
 
     def _distance_to_point(self, point):
-        dx = point[0] - self.position[0]
-        dy = point[1] - self.position[1]
-        return math.hypot(dx, dy)
+        return distance(self.position, point)
 
     def _bearing_to_point(self, point):
-        dx = point[0] - self.position[0]
-        dy = point[1] - self.position[1]
-        return math.degrees(math.atan2(dy, dx)) % 360
+        return bearing(self.position, point)
 
     def detect_target(self, target):
         return self.radar.detect(self.position, target.position, target.rcs)
 
     def receive_gci_command(self, target):
-        if random.random() < self.command_failure_chance:
-            print(f"{self.name} GCI command disrupted by ECM!")
+        if self.rng.random() < self.command_failure_chance:
+            say(f"{self.name} GCI command disrupted by ECM!")
             return
         if not self.dogfight_mode:
             self.heading = self._bearing_to_point(target.position)
@@ -263,21 +345,16 @@ class MiG23:
         if self.fuel <= 0:
             self.speed = 0
             self.rtb_mode = True
-            print(f"{self.name} OUT OF FUEL - Forced RTB")
+            say(f"{self.name} OUT OF FUEL - Forced RTB")
             return
 
         fuel_burn = self.fuel_burn_rate * time_sec
         if self.dogfight_mode:
             fuel_burn *= 1.5
-            self.heading = (self.heading + random.uniform(-10, 10)) % 360
+            self.heading = (self.heading + self.rng.uniform(-10, 10)) % 360
         self.fuel -= fuel_burn
 
-        dist_km = self.speed * (time_sec / 3600)
-        rad = math.radians(self.heading)
-        dx = dist_km * math.cos(rad)
-        dy = dist_km * math.sin(rad)
-        x, y = self.position
-        self.position = (x + dx, y + dy)
+        self.position = advance(self.position, self.heading, self.speed, time_sec)
 
     def attempt_gun_fire(self, target):
         if not target.alive:
@@ -290,12 +367,12 @@ class MiG23:
         if bearing_diff > 10:
             return False
         self.weapons_fired += 1
-        hit = random.random() < 0.6
+        hit = self.rng.random() < self.gun_hit_chance
         if hit:
-            print(f"{self.name} fired guns and hit {target.id} at {distance:.1f} km!")
+            say(f"{self.name} fired guns and hit {target.id} at {distance:.1f} km!")
             target.alive = False
         else:
-            print(f"{self.name} fired guns and missed {target.id} at {distance:.1f} km.")
+            say(f"{self.name} fired guns and missed {target.id} at {distance:.1f} km.")
         return True
 
     def status(self):
@@ -315,7 +392,7 @@ class GroundTarget:
         self.health -= dmg
         if self.health <= 0:
             self.alive = False
-            print(f"*** Ground target {self.id} destroyed! ***")
+            say(f"*** Ground target {self.id} destroyed! ***")
 
     def status(self):
         x, y = self.position
@@ -337,7 +414,7 @@ class GlideBomb:
         dy = self.target.position[1] - self.position[1]
         dist = math.hypot(dx, dy)
         if dist < 0.1:
-            print(f"Glide bomb hit {self.target.id}!")
+            say(f"Glide bomb hit {self.target.id}!")
             self.target.take_damage(50)
             self.alive = False
             return
@@ -359,25 +436,24 @@ class MiG27:
         self.rtb_mode = False
         self.target_ground = None
         self.alive=1
+        self.rng = rs(name)
 
     def _distance_to_point(self, point):
-        dx = point[0] - self.position[0]
-        dy = point[1] - self.position[1]
-        return math.hypot(dx, dy)
+        return distance(self.position, point)
 
     def select_ground_target(self, targets):
         alive_targets = [t for t in targets if t.alive]
         if alive_targets:
-            self.target_ground = random.choice(alive_targets)
-            print(f"{self.name} selected ground target {self.target_ground.id}")
+            self.target_ground = alive_targets[self.rng.integers(len(alive_targets))]
+            say(f"{self.name} selected ground target {self.target_ground.id}")
         else:
-         	print("RTB ", self.name)
+         	say("RTB ", self.name)
          	self.rtb_mode=1
     def attack_ground_target(self):
         if self.target_ground and self.fuel > 0:
             bomb = GlideBomb(position=self.position, target=self.target_ground)
             self.glide_bombs.append(bomb)
-            print(f"{self.name} launched glide bomb at {self.target_ground.id}")
+            say(f"{self.name} launched glide bomb at {self.target_ground.id}")
             self.fuel -= 0# bomb launch fuel cost
             self.weapons_fired += 1
 
@@ -385,7 +461,7 @@ class MiG27:
         if self.fuel <= 0:
             self.speed = 0
             self.rtb_mode = True
-            print(f"{self.name} out of fuel!")
+            say(f"{self.name} out of fuel!")
             return
         if(self.rtb_mode):
         	return
@@ -422,7 +498,7 @@ class MiG27:
                 f"Fuel={self.fuel:.0f} GlideBombs={len(self.glide_bombs)} "
                 f"Weapons Fired={self.weapons_fired} RTB={self.rtb_mode}")
 def generate_debrief(migs, enemies, ground_targets, starten,sams):
-    print("\n=== MISSION DEBRIEF ===\n")
+    say("\n=== MISSION DEBRIEF ===\n")
 
     total_sorties = len(migs)
     total_weapons_fired = sum(m.weapons_fired for m in migs)
@@ -431,33 +507,48 @@ def generate_debrief(migs, enemies, ground_targets, starten,sams):
     enemy_kills = sum(1 for e in enemies if not e.alive)
     ground_kills = sum(1 for g in ground_targets if not g.alive)
 
-    print(f"Total Sorties: {total_sorties}")
-    print(f"Enemy Aircraft Destroyed: {starten-len(enemies)} / {starten}")
-    print(f"Ground Targets Destroyed: {ground_kills} / {len(ground_targets)}")
-    print(f"Total Weapons Fired: {total_weapons_fired}")
-    print(f"Sorties that Returned to Base or Landed: {total_rtb} / {total_sorties}")
+    say(f"Total Sorties: {total_sorties}")
+    say(f"Enemy Aircraft Destroyed: {starten-len(enemies)} / {starten}")
+    say(f"Ground Targets Destroyed: {ground_kills} / {len(ground_targets)}")
+    say(f"Total Weapons Fired: {total_weapons_fired}")
+    say(f"Sorties that Returned to Base or Landed: {total_rtb} / {total_sorties}")
 
-    print("\n--- Pilot Status ---")
+    say("\n--- Pilot Status ---")
     for m in migs:
         status = "LANDED" if m.speed == 0 else "RTB" if m.rtb_mode else "IN AIR"
-        print(f"{m.name}: Weapons Fired={m.weapons_fired}, Fuel Left={m.fuel:.0f}kg, Status={status}")
+        say(f"{m.name}: Weapons Fired={m.weapons_fired}, Fuel Left={m.fuel:.0f}kg, Status={status}")
 
-    print("\n--- Enemy Survivors ---")
+    say("\n--- Enemy Survivors ---")
     for e in enemies:
         if e.alive:
-            print(f"{e.id} [{e.type}] Pos=({e.position[0]:.1f}, {e.position[1]:.1f}) Alt={e.altitude:.0f}m")
+            say(f"{e.id} [{e.type}] Pos=({e.position[0]:.1f}, {e.position[1]:.1f}) Alt={e.altitude:.0f}m")
 
-    print("\n--- Ground Targets Remaining ---")
+    say("\n--- Ground Targets Remaining ---")
     for g in ground_targets:
         if g.alive:
-            print(f"{g.id} Pos=({g.position[0]:.1f}, {g.position[1]:.1f})")
+            say(f"{g.id} Pos=({g.position[0]:.1f}, {g.position[1]:.1f})")
     
     if sams:
-        print("\n--- Ground Defense Summary ---")
+        say("\n--- Ground Defense Summary ---")
         for sam in sams:
-            print(f"{sam.name}: Cooldown Remaining={sam.cooldown:.1f}s")
-
-    print("\n=== END OF DEBRIEF ===")
+            say(f"{sam.name}: Cooldown Remaining={sam.cooldown:.1f}s")
+
+    say("\n=== END OF DEBRIEF ===")
+
+def outcome(migs, enemies, ground_targets, starten, sams):
+    """The debrief figures as a dict, for batch runs."""
+    return {
+        "kills": starten - len(enemies),
+        "enemies": starten,
+        "rtb": sum(1 for m in migs if m.rtb_mode or m.fuel <= 0 or m.speed == 0),
+        "sorties": len(migs),
+        "migs_lost": sum(1 for m in migs if not m.alive),
+        "weapons": sum(m.weapons_fired for m in migs),
+        "ground_kills": sum(1 for g in ground_targets if not g.alive),
+        "ground": len(ground_targets),
+        "sam_shots": sum(s.shots for s in sams),
+        "sam_kills": sum(s.kills for s in sams),
+    }
 
 class GroundDefense:
     def __init__(self, name, position, detection_range_km, fire_range_km, cooldown_time, hit_chance=0.5):
@@ -468,11 +559,12 @@ class GroundDefense:
         self.cooldown = 0
         self.cooldown_time = cooldown_time
         self.hit_chance = hit_chance
+        self.rng = rs(name)
+        self.shots = 0
+        self.kills = 0
 
     def _distance_to(self, aircraft):
-        dx = aircraft.position[0] - self.position[0]
-        dy = aircraft.position[1] - self.position[1]
-        return math.hypot(dx, dy)
+        return distance(self.position, aircraft.position)
 
     def engage(self, aircraft, time_step=1.0):
         if self.cooldown > 0:
@@ -483,60 +575,131 @@ class GroundDefense:
         dist = self._distance_to(aircraft)
         if dist < self.fire_range_km:
             self.cooldown = self.cooldown_time
-            print(f"{self.name} fires at {aircraft.name}")
+            self.shots += 1
+            say(f"{self.name} fires at {aircraft.name}")
             evade_penalty = 0.5 if getattr(aircraft, "evasive", False) else 1.0
-            if random.random() < self.hit_chance * evade_penalty:
+            if self.rng.random() < self.hit_chance * evade_penalty:
                 aircraft.alive = False
-                print(f"{aircraft.name} was destroyed by {self.name}!")
-
-def main():
+                self.kills += 1
+                say(f"{aircraft.name} was destroyed by {self.name}!")
+
+# tunables for run(); the defaults are the values the classes carry
+CFG = {
+    "mig25_detection": 0.95,
+    "mig23_detection": 0.8,
+    "missile_hit": 0.8,
+    "gun_hit": 0.6,
+    "sam_hit": 0.1,
+    "sam1_cooldown": 100,
+    "sam2_cooldown": 80,
+    "maxtime": maxtime,
+    # advance by events (eventloop) instead of every second
+    "events": False,
+}
+
+def run(seed=None, cfg=None, verbose=False, rep=None):
+    """One mission, returns outcome().
+
+    The mission draws from streams(seed, rep), so replication rep of a
+    batch can be rerun on its own; cfg overrides entries of CFG. Unless
+    verbose nothing is printed."""
+    global quiet, rs
+    c = dict(CFG, **(cfg or {}))
+    rs = streams(seed, rep)
+    # kills are recorded by enemy id, which every mission reuses
+    deadtargets.clear()
+    was = quiet
+    quiet = not verbose
+    try:
+        return (eventloop if c["events"] else mission)(c)
+    finally:
+        quiet = was
+
+def setup(c):
     # Create aircraft
     mig25s = [MiG25(f"MiG25_{i+1}") for i in range(2)]
     mig23s = [MiG23(f"MiG23_{i+1}") for i in range(2)]
     mig27s = [MiG27(f"MiG27_{i+1}") for i in range(1)]
+    for mig in mig25s:
+        mig.radar.base_detection_prob = c["mig25_detection"]
+        mig.missile_hit_chance = c["missile_hit"]
+    for mig in mig23s:
+        mig.radar.base_detection_prob = c["mig23_detection"]
+        mig.gun_hit_chance = c["gun_hit"]
 
     enemies = generate_random_enemies(6)
-    starten = len(enemies)
-    ground_targets = [GroundTarget(f"GT{i+1}", (random.uniform(10, 40), random.uniform(-20, 20))) for i in range(3)]
+    ground_targets = [GroundTarget(f"GT{i+1}", (rs(f"GT{i+1}").uniform(10, 40), rs(f"GT{i+1}").uniform(-20, 20))) for i in range(3)]
 
     # Initialize SAM ground defenses
     sams = [
-        GroundDefense("SAM1", (25, 5), detection_range_km=40, fire_range_km=10, cooldown_time=100, hit_chance=0.1),
-        GroundDefense("SAM2", (35, -10), detection_range_km=35, fire_range_km=8, cooldown_time=80, hit_chance=0.1),
+        GroundDefense("SAM1", (25, 5), detection_range_km=40, fire_range_km=10, cooldown_time=c["sam1_cooldown"], hit_chance=c["sam_hit"]),
+        GroundDefense("SAM2", (35, -10), detection_range_km=35, fire_range_km=8, cooldown_time=c["sam2_cooldown"], hit_chance=c["sam_hit"]),
     ]
+    return mig25s, mig23s, mig27s, enemies, ground_targets, sams
+
+# one decision of each aircraft type, shared by mission() and eventloop()
+def act25(mig, enemies):
+    live_targets = [e for e in enemies if e.alive]
+    if not live_targets:
+        mig.rtb_mode = True
+        say(f"{mig.name} RTB: All targets destroyed")
+        return False
+    target = min(live_targets, key=lambda e: mig._distance_to_point(e.position))
+    if target.id in deadtargets:
+        target.alive = False
+    if mig.detect_target(target):
+        mig.receive_gci_command(target)
+        if not mig.launch_missile(target):
+            pass
+        else:
+            mig.launch_missile(target)
+    else:
+        say(f"{mig.name} lost target detection.")
+    return True
+
+def act23(mig, enemies):
+    live_targets = [e for e in enemies if e.alive]
+    if not live_targets:
+        mig.rtb_mode = True
+        say(f"{mig.name} RTB: All targets destroyed")
+        return False
+    target = min(live_targets, key=lambda e: mig._distance_to_point(e.position))
+    mig.receive_gci_command(target)
+    if mig._distance_to_point(target.position) < dogfight_km:
+        mig.dogfight_mode = True
+        mig.attempt_gun_fire(target)
+    else:
+        mig.dogfight_mode = False
+    return True
+
+def act27(mig, ground_targets):
+    if mig.target_ground is None or not mig.target_ground.alive:
+        mig.select_ground_target(ground_targets)
+    if mig.target_ground and mig._distance_to_point(mig.target_ground.position) < 25:
+        mig.attack_ground_target()
+
+def mission(c):
+    mig25s, mig23s, mig27s, enemies, ground_targets, sams = setup(c)
+    starten = len(enemies)
 
-    max_time = maxtime  # seconds
+    max_time = c["maxtime"]  # seconds
     time_step = 1
 
     for t in range(0, max_time, time_step):
-        print(f"\n=== Time {t}s ===")
+        say(f"\n=== Time {t}s ===")
 
         # Update enemy aircraft
         for enemy in enemies:
             enemy.update_position(time_step)
             if enemy.alive:
-                print(enemy.status())
+                say(enemy.status())
 
         # MiG-25 actions
         for mig in mig25s:
             if mig.rtb_mode or not mig.alive:
                 continue
-            live_targets = [e for e in enemies if e.alive]
-            if not live_targets:
-                mig.rtb_mode = True
-                print(f"{mig.name} RTB: All targets destroyed")
+            if not act25(mig, enemies):
                 continue
-            target = min(live_targets, key=lambda e: mig._distance_to_point(e.position))
-            if target.id in deadtargets:
-                target.alive = False
-            if mig.detect_target(target):
-                mig.receive_gci_command(target)
-                if not mig.launch_missile(target):
-                    pass
-                else:
-                    mig.launch_missile(target)
-            else:
-                print(f"{mig.name} lost target detection.")
             mig.update_position(time_step)
             missile_result = mig.update_missile()
             if missile_result is not None:
@@ -545,26 +708,16 @@ def main():
                         e.alive = False
 
             enemies = [e for e in enemies if e.alive]
-            print(mig.status())
+            say(mig.status())
 
         # MiG-23 actions
         for mig in mig23s:
             if mig.rtb_mode or not mig.alive:
                 continue
-            live_targets = [e for e in enemies if e.alive]
-            if not live_targets:
-                mig.rtb_mode = True
-                print(f"{mig.name} RTB: All targets destroyed")
+            if not act23(mig, enemies):
                 continue
-            target = min(live_targets, key=lambda e: mig._distance_to_point(e.position))
-            mig.receive_gci_command(target)
-            if mig._distance_to_point(target.position) < 5:
-                mig.dogfight_mode = True
-                mig.attempt_gun_fire(target)
-            else:
-                mig.dogfight_mode = False
             mig.update_position(time_step)
-            print(mig.status())
+            say(mig.status())
 
         # MiG-27 ground attack
         # Ground defense engagements
@@ -575,12 +728,9 @@ def main():
         for mig in mig27s:
             if mig.fuel <= 0 or not mig.alive or mig.rtb_mode:
                 continue
-            if mig.target_ground is None or not mig.target_ground.alive:
-                mig.select_ground_target(ground_targets)
-            if mig.target_ground and mig._distance_to_point(mig.target_ground.position) < 25:
-                mig.attack_ground_target()
+            act27(mig, ground_targets)
             mig.update(time_step)
-            print(mig.status())
+            say(mig.status())
 
         # Ground defense engagements (SAMs)
         for sam in sams:
@@ -592,12 +742,289 @@ def main():
         if(t==max_time-1):
         	generate_debrief(mig25s + mig23s + mig27s, enemies, ground_targets, starten, sams=sams)
         if not any(e.alive for e in enemies) or not any(mig.alive for mig in mig25s + mig23s + mig27s):
-            print("\nAll air combatants have been neutralized or MiGs out of fuel/life. Ending mission.")
+            say("\nAll air combatants have been neutralized or MiGs out of fuel/life. Ending mission.")
             generate_debrief(mig25s + mig23s + mig27s, enemies, ground_targets, starten, sams=sams)
             break
-  
-            
-            
+    res = outcome(mig25s + mig23s + mig27s, enemies, ground_targets, starten, sams)
+    res["time"] = t + time_step
+    return res
+
+def wake(sec):
+    # whole seconds to the next decision, never less than one step
+    return max(1, int(min(sec, 1e9)))
+
+def engage(sams, migs):
+    # one of mission()'s two SAM passes
+    for sam in sams:
+        for mig in migs:
+            if mig.alive:
+                sam.engage(mig, 1)
+
+def eventloop(c):
+    """mission() advanced from event to event instead of every second.
+
+    MiG25s, MiG23s and the SAM sites keep wake times in a heap and take
+    their full decision only when they wake; the clock jumps from one wake
+    to the next. A MiG25 wakes at the first second a contact could come
+    into missile range at the fastest closing speed present, at fuel
+    exhaustion, and every second with a missile or evasive turn under way;
+    a MiG23 likewise for dogfight_km. The seconds they skip are replayed on
+    their own: nothing dies between wakes, so their targets are the live
+    enemies flown straight from the start of the gap, and each skipped
+    second takes the radar and GCI rolls mission() would, from the same
+    streams (a MiG23's GCI rolls drawn together).
+
+    MiG27s answer only to their ground targets and are replayed second by
+    second through every gap. The SAM sites wake when a cooldown could run
+    out, when a MiG25/23 could come into fire range, or at the first second
+    a look ahead on a copy of the MiG27s puts one inside a fire range.
+
+    For the same seed both give the same outcome."""
+    mig25s, mig23s, mig27s, enemies, ground_targets, sams = setup(c)
+    starten = len(enemies)
+    migs = mig25s + mig23s + mig27s
+    air = mig25s + mig23s
+    max_time = c["maxtime"]
+    # km/s: fastest MiG25/23, and fastest closing between one and an enemy
+    vmig = max((m.speed for m in air), default=0) / 3600
+    vmax = vmig + max((e.speed for e in enemies), default=0) / 3600
+
+    q = []
+    def push(k, t):
+        heapq.heappush(q, (min(t, max_time), k))
+    for m in air:
+        push(m.name, 1)
+    # the sites wake together, engage passes run over all of them
+    push("sams", 1)
+    # closes the mission when nothing else is left to wake
+    push("", max_time)
+
+    def nearest(p, xs):
+        return min((distance(p, x.position) for x in xs if x.alive), default=math.inf)
+
+    def due25(mig):
+        if (mig.current_missile and mig.current_missile.alive) or mig.evasive:
+            return 1
+        d = nearest(mig.position, enemies)
+        return min((d - mig.max_fire_range) / vmax, mig.fuel / mig.fuel_burn_rate)
+
+    def due23(mig):
+        if mig.dogfight_mode:
+            return 1
+        d = nearest(mig.position, enemies)
+        return min((d - dogfight_km) / vmax, mig.fuel / mig.fuel_burn_rate)
+
+    def seen(j):
+        # the enemies at second j of the gap, from track; kills only come at
+        # a wake, so only the last second can be missing one and only the
+        # ones before it are shared between aircraft
+        if j < g and j in at:
+            return at[j]
+        ps = [(e, advance(p, e.heading, e.speed, j)) for e, p in track if e.alive or j < g]
+        if j < g:
+            at[j] = ps
+        return ps
+
+    def rtb(mig):
+        mig.rtb_mode = True
+        say(f"{mig.name} RTB: All targets destroyed")
+        return False
+
+    def radar25(mig, k):
+        # act25 for the first k of g seconds, out of missile range: a radar
+        # roll at the nearest enemy and a GCI roll if it is seen, made on a
+        # stand-in for the enemy where it is that second
+        for j in range(1, k + 1):
+            ps = seen(j)
+            if not ps:
+                return rtb(mig)
+            e, p = min(ps, key=lambda x: mig._distance_to_point(x[1]))
+            tgt = EnemyAircraft(e.id, e.type, p, e.heading, e.speed, e.altitude, e.rcs)
+            if mig.detect_target(tgt):
+                mig.receive_gci_command(tgt)
+            else:
+                say(f"{mig.name} lost target detection.")
+            mig.update_position(1)
+        return True
+
+    def gci23(mig, k):
+        # act23 for the first k of g seconds, out of gun range; the rolls
+        # left over when the last second finds nothing are never read, the
+        # mission ends there
+        ok = mig.rng.random(k) >= mig.command_failure_chance
+        for j in range(1, k + 1):
+            ps = seen(j)
+            if not ps:
+                return rtb(mig)
+            tp = min((p for _, p in ps), key=mig._distance_to_point)
+            if ok[j - 1]:
+                mig.heading = mig._bearing_to_point(tp)
+            else:
+                say(f"{mig.name} GCI command disrupted by ECM!")
+            mig.update_position(1)
+        return True
+
+    def fly(mig, g, now, act, skip):
+        # the skipped seconds, then mission()'s decide and step
+        if mig.name not in now:
+            return skip(g)
+        if g > 1 and not skip(g - 1):
+            return False
+        if not act():
+            return False
+        mig.update_position(1)
+        return True
+
+    def live():
+        return sum(1 for m in migs if m.alive)
+
+    def drain(k):
+        # engage takes a step off a cooldown for each live aircraft it
+        # checks, twice a second; a skipped second never reaches zero
+        # before its last check, and only a SAM shot changes live()
+        n = 2 * live() * k
+        for sam in sams:
+            if sam.cooldown > 0:
+                sam.cooldown -= n
+
+    def step27():
+        # one second of mission()'s MiG27s
+        for mig in mig27s:
+            if mig.fuel <= 0 or not mig.alive or mig.rtb_mode:
+                continue
+            act27(mig, ground_targets)
+            mig.update(1)
+            if not quiet:
+                say(mig.status())
+
+    def plan27():
+        # for each site, the seconds from now on at which one of its passes
+        # finds a MiG27 inside its fire range, and whether it does for good
+        # once they have all parked. MiG27.update's steering does not keep
+        # the step within its speed, so instead of a distance bound the
+        # MiG27s (and what they bomb) fly ahead on a copy; only a SAM shot
+        # can change where they go
+        global quiet
+        hits = [[] for _ in sams]
+        ms, gts = copy.deepcopy((mig27s, ground_targets))
+        def look():
+            return [any(m.alive and sam._distance_to(m) < sam.fire_range_km for m in ms) for sam in sams]
+        was = quiet
+        quiet = True
+        try:
+            for s in range(t + 1, max_time + 1):
+                a = look()
+                fly = [m for m in ms if m.fuel > 0 and m.alive and not m.rtb_mode]
+                for m in fly:
+                    act27(m, gts)
+                    m.update(1)
+                b = look()
+                for i in range(len(sams)):
+                    if a[i] or b[i]:
+                        hits[i].append(s)
+                if not fly:
+                    return hits, s, b
+        finally:
+            quiet = was
+        return hits, math.inf, [False] * len(sams)
+
+    plan = [None, None]
+    def reach27(i):
+        # seconds until site i next sees a MiG27 in its fire range
+        key = tuple(m.alive for m in mig27s)
+        if plan[0] != key:
+            plan[0], plan[1] = key, plan27()
+        hits, park, stay = plan[1]
+        k = bisect.bisect_right(hits[i], t)
+        if k < len(hits[i]):
+            return hits[i][k] - t
+        return 1 if stay[i] and t >= park else math.inf
+
+    def duesam():
+        n = 2 * max(live(), 1)
+        return min(sam.cooldown // n + 1 if sam.cooldown > 0 else
+                   min((nearest(sam.position, air) - sam.fire_range_km) / vmig, reach27(i))
+                   for i, sam in enumerate(sams))
+
+    t = last = steps = 0
+    while q:
+        steps += 1
+        t = q[0][0]
+        now = set()
+        while q and q[0][0] == t:
+            now.add(heapq.heappop(q)[1])
+        g = t - last
+        last = t
+        say(f"\n=== Time {t - g}s +{g}s ===")
+
+        track = [(e, e.position) for e in enemies if e.alive]
+        at = {}
+        for enemy in enemies:
+            enemy.update_position(g)
+            if enemy.alive and not quiet:
+                say(enemy.status())
+
+        for mig in mig25s:
+            if mig.rtb_mode or not mig.alive:
+                continue
+            if not fly(mig, g, now, lambda: act25(mig, enemies), lambda k: radar25(mig, k)):
+                continue
+            missile_result = mig.update_missile()
+            if missile_result is not None:
+                for e in enemies:
+                    if e.id == missile_result:
+                        e.alive = False
+            enemies = [e for e in enemies if e.alive]
+            if not quiet:
+                say(mig.status())
+
+        for mig in mig23s:
+            if mig.rtb_mode or not mig.alive:
+                continue
+            if not fly(mig, g, now, lambda: act23(mig, enemies), lambda k: gci23(mig, k)):
+                continue
+            if not quiet:
+                say(mig.status())
+
+        # the sites cannot fire before their wake, so the MiG27s fly the
+        # gap up to it on their own
+        if "sams" in now:
+            drain(g - 1)
+            for _ in range(g - 1):
+                step27()
+            engage(sams, migs)
+            step27()
+            engage(sams, migs)
+        else:
+            drain(g)
+            for _ in range(g):
+                step27()
+
+        if t >= max_time:
+            generate_debrief(migs, enemies, ground_targets, starten, sams=sams)
+            break
+        if not any(e.alive for e in enemies) or not any(mig.alive for mig in migs):
+            say("\nAll air combatants have been neutralized or MiGs out of fuel/life. Ending mission.")
+            generate_debrief(migs, enemies, ground_targets, starten, sams=sams)
+            break
+
+        for mig in mig25s:
+            if mig.name in now and mig.alive and not mig.rtb_mode:
+                push(mig.name, t + wake(due25(mig)))
+        for mig in mig23s:
+            if mig.name in now and mig.alive and not mig.rtb_mode:
+                push(mig.name, t + wake(due23(mig)))
+        if "sams" in now:
+            push("sams", t + wake(duesam()))
+        if "" in now:
+            push("", max_time)
+    res = outcome(migs, enemies, ground_targets, starten, sams)
+    res["time"] = t
+    res["steps"] = steps
+    return res
+
+def main(seed=None):
+    return run(seed, verbose=True)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,27 @@
+import zlib
+import numpy as np
+
+def keyint(key):
+    # stable across processes, unlike hash()
+    return zlib.crc32(str(key).encode())
+
+class streams:
+    """One random generator per named entity of a run.
+
+    Each entity draws from its own Philox generator, seeded with the run's
+    SeedSequence extended by a child key taken from the entity name, so its
+    draws do not depend on how many other entities exist or on the order
+    they act in. Replication rep of a batch is streams(seed, rep), the same
+    sequence as SeedSequence(seed).spawn(n)[rep]."""
+    def __init__(self, seed=None, rep=None):
+        self.ss = np.random.SeedSequence(seed, spawn_key=() if rep is None else (rep,))
+        self.seed = self.ss.entropy
+        self.rep = rep
+        self.g = {}
+
+    def __call__(self, key):
+        g = self.g.get(key)
+        if g is None:
+            ss = np.random.SeedSequence(self.seed, spawn_key=self.ss.spawn_key + (keyint(key),))
+            g = self.g[key] = np.random.Generator(np.random.Philox(ss))
+        return g
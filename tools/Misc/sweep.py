@@ -0,0 +1,45 @@
+import csv
+import io
+import sys
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pen
+
+# one output row per (round, armor); armor None is the catalogue default
+# (steel, gel for the 9mm clay shot)
+COLS = ("round", "armor", "diameter", "speed", "mass", "energy", "pen", "barrel", "lethal")
+
+def one(job):
+    r, ak = job
+    # each job builds its own round and plate from the registry, so workers
+    # never see each other's mutations; lethalcalc's chatter is dropped
+    with contextlib.redirect_stdout(io.StringIO()):
+        mat = pen.mkround(r)
+        armor = None if ak is None else pen.getmat(ak)
+        res = pen.dopenr(mat, armor)
+    return (r[0], ak or "default") + tuple(res[c] for c in COLS[2:])
+
+def sweep(rounds=pen.ROUNDS, armors=(None,), workers=None):
+    """Evaluate every round against every armor key, in table order."""
+    jobs = [(r, a) for r in rounds for a in armors]
+    if workers == 1:
+        return [one(j) for j in jobs]
+    with ProcessPoolExecutor(workers) as ex:
+        return list(ex.map(one, jobs))
+
+def torec(rows):
+    return np.rec.fromrecords(rows, names=COLS)
+
+def tocsv(rows, fn):
+    with open(fn, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(COLS)
+        w.writerows(rows)
+    return fn
+
+if __name__ == "__main__":
+    # python sweep.py [out.csv] [armor keys...]
+    fn = sys.argv[1] if len(sys.argv) > 1 else "rounds.csv"
+    armors = tuple(sys.argv[2:]) or (None,)
+    print("exported to ", tocsv(sweep(armors=armors), fn))
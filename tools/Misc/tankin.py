@@ -1,31 +1,61 @@
 import json
 import sympy as sp
 import copy
+import functools
 from collections.abc import Iterable
 import os
+import sys
 
 import nuct 
 import thull
 import pen
 import numpy as np
+from hmap import hmap
+import los
+import plan
+import tsched
+import tkjson
+from sgrid import sgrid
+import tkbin
 from datetime import datetime as dt
 
 dp=2
+# float32 heightmaps past this many bytes are generated into a file
+HMAX=1<<31
+# spatial index cell edge in heightmap cells
+SMUL=64
 m=dp**sp.GoldenRatio
 m=float(m)
-an=nuct.baseobj()
-am=an.am
-ran=am**3
-ran=int(round(ran))
-rc=round(os.sys.getsizeof(ran)/4)
-boh=thull.baseobj()
-sker=pen.getskin()
-nf=nuct.pm
+
+@functools.cache
+def getan():
+	return nuct.baseobj()
+
+def getam():
+	return getan().am
+
+@functools.cache
+def getran():
+	return int(round(getam()**3))
+
+def getrc():
+	return round(os.sys.getsizeof(getran())/4)
+
+@functools.cache
+def getboh():
+	return thull.baseobj()
+
+@functools.cache
+def getsker():
+	return pen.getskin()
+
+def getnf():
+	return nuct.pm
 
 def saf(x):
 	if isinstance(x,sp.Basic):
 		if(x.is_number):
-			return float(x)
+			return tkjson.num(x)
 	if isinstance(x,dict):
 		return {saf(k): saf(v) for k,v in x.items()}
 	if isinstance(x,(list,tuple,set)):
@@ -39,16 +69,17 @@ def doff(s):
         strr+="f"
     return strr
     
-wc=int(doff(rc),16)
-wc1=(wc/ran)
+@functools.cache
+def getwc():
+	return int(doff(getrc()),16)
+
+def getwc1():
+	return getwc()/getran()
 
 class en(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, sp.Basic):
-            if obj.free_symbols:
-                return str(obj)
-            else:  
-                return float(sp.N(obj))
+            return tkjson.num(obj)
 
         elif hasattr(obj, "__dict__"):
             return {k: self.default(v) for k, v in obj.__dict__.items()}
@@ -68,24 +99,36 @@ class en(json.JSONEncoder):
 
 def en2(tf):
     return copy.deepcopy(tf)
-t1 = en2(boh)
+
+@functools.cache
+def gett1():
+	return en2(getboh())
+
+LAZY={"an":getan,"am":getam,"ran":getran,"rc":getrc,"boh":getboh,"sker":getsker,
+	"nf":getnf,"wc":getwc,"wc1":getwc1,"t1":gett1}
+
+def __getattr__(name):
+	if name in LAZY:
+		return LAZY[name]()
+	raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 class tankin:
     def __init__(self,mam=1):
         co = 5
         self.cf = {}
-        self.term={}
+        self.term=None
         self.times = 0
         self.teams = {0, co}
         self.clo=0
         self.hmm=self.hm()
         f1=0
         f2=0
+        t1=gett1()
         if(mam!=0):
         	f1 = t1.turn(90)
         	f2,_ = t1.timett(90, 0)
         self.times = mam*(min(f1, f2) * 16).evalf()
-        self.maxx = self.times * t1.rspe() * am
+        self.maxx = self.times * t1.rspe() * getam()
         self.maxx = self.maxx.evalf()
         self.maxy = self.maxx
         self.maxxr=round(self.maxx)
@@ -95,12 +138,14 @@ class tankin:
         self.rr=round(self.hmm)
         self.l=0
         self.inw(t1)
-        self.tse=""
-        self.r2=int(round(ran/self.rr))
+        self.r2=int(round(getran()/self.rr))
         self.cou=2
         self.fm=self.fom()
         self.fr=self.refs(self.fm)
-        self.mv=[]
+        self.mv=tsched.mlog()
+        self.losk=None
+        self.pl={}
+        self.ix=sgrid(self.rr*SMUL)
         
         for te in self.teams:
             maxe = self.maxx
@@ -113,24 +158,25 @@ class tankin:
             t.tf*=self.rr
             
     def fs(self,x,y):
-    	for i in self.term.keys():
-    		if int(i)>=x:
-    			for j in self.term[i].keys():
-    				if int(j) >= y:
-    					return i,j
-    	return 0,0
+    	rr=self.rr
+    	i=-(-x//rr)*rr
+    	j=-(-y//rr)*rr
+    	if i>self.term.maxx() or j>self.term.maxy():
+    		return 0,0
+    	return i,j
     
     def dot(self, st, co, x, t11):
         if not self.checkif():
         	self.termm()
         for i in range(co):
-            t = en2(t11)
-            t.name=i
-            t.x = int(x+i+(co-st))
-            t.y = 0
+            t = thull.unit(t11,i,int(x+i+(co-st)),0)
             t.z=self.getsl(t.x,t.y)
             fj = i + st
             self.cf[fj] = t
+            t.slot=fj
+            t.team=st
+            t.grid=self.ix
+            self.ix.add(fj,t.x,t.y)
         return self
     
     def tim2(self,x):
@@ -142,35 +188,31 @@ class tankin:
         self.maxx=self.tim2(self.maxx)
         self.maxy=self.tim2(self.maxy)
     
-    def termm(self):
+    def termm(self,fn=None):
+            # fn streams the grid into that .tkh instead of memory, which
+            # also happens by itself past HMAX bytes
             if(self.checkif()==1):
                 return
             self.timer()
             rr=self.rr
-            fl=0
-            self.term[0]={}
-            for i in range(0,self.maxyr,self.rr):
-            	self.term[0][i]=fl
-            self.term[0][0]=fl
-            co=self.term[0].copy()
-            for  i in range(0,self.maxxr,self.rr):
-            	self.term[i]=co.copy()
-            for i in range(rr,self.maxxr,self.rr): 
-                self.doj(i,self.rr)
+            nx=len(range(0,self.maxxr,rr))
+            ny=len(range(0,self.maxyr,rr))
+            if fn is None and nx*ny*4>HMAX:
+                fn="f.tkh"
+            if fn is not None:
+                self.term=tkbin.genhm(fn,nx,ny,rr,getran(),getwc(),self.r2,getwc1())
+                return
+            self.term=hmap(nx,ny,rr).gen(getran(),getwc(),self.r2,getwc1())
     
     def doj(self, i,rr):
-          fof=self.term[i].copy().keys()
-          self.term[i-rr][0-rr]=0
-          self.term[i][0-rr]=0
-          for j in fof:
-                #zper=self.highz(i,j,rr)
+          for j in range(0,self.maxyr,rr):
                 zper=1
                 self.dol(i,j,zper)
     
     def highz(self,i,j,rr):
-            zper = self.term[i - rr][j - rr]
-            z2 = self.term[i - rr][j]
-            z3=self.term[i][j-rr]
+            zper = self.term.at(i - rr,j - rr)
+            z2 = self.term.at(i - rr,j)
+            z3=self.term.at(i,j-rr)
             zper=float((zper+z2+z3)/3)
             return zper
             
@@ -192,22 +234,22 @@ class tankin:
             zper=zper*(i*j+i+j)
             zper=self.hash32(zper)
             zper/=self.r2
-            zper-=wc1
-            self.term[i][j] =1/abs(zper)
+            zper-=getwc1()
+            self.term.h[i//self.rr,j//self.rr] =1/abs(zper)
             return zper
     
     def hash32(self,x):
         x=int(x)
-        x *= ran
-        return x & wc
+        x *= getran()
+        return x & getwc()
             
     def hm(self):
-            nn=nf
-            sk=sker
+            nn=getnf()
+            sk=getsker()
             n1=nn/sk.density
             fr=(3**6)**12
             nn*=fr           
-            nn/=nf
+            nn/=getnf()
             nn**=(1/3)
             nn*=n1
             return nn
@@ -232,24 +274,49 @@ class tankin:
         self.wff(s,fn)
                 
     def wff(self,s,fn):
-     	with open(fn, "w") as f:
-                json.dump(s, f)  
-                print("exported to ",fn)
+        tkjson.save(fn,tkjson.plain(s))
+        print("exported to ",fn)
     
     def savet(self):
-        self.saved(self.cf,"re"+str(dt.now().timestamp())+".json")
+        # column snapshot of every tank plus the shared hull fields
+        fn="re"+str(dt.now().timestamp())+".json"
+        tkjson.save(fn,tkjson.state(self))
+        print("exported to ",fn)
+    
+    def savem(self,fn="f.tkh"):
+            if(self.l==1):
+                return
+            tkbin.savehm(fn,self.term)
+            print("exported to ",fn)
+    
+    def savemv(self,fn="f2.tkt"):
+            tkbin.savetr(fn,self.mv.rows())
+            print("exported to ",fn)
     
-    def savem(self):
+    # the json exports tankin wrote before the binary formats, for readers
+    # that still want them: the terrain as a nested dict and the moves as
+    # "|<slot> tank moved to x,y" text, both what ph.py falls back to
+    def savemj(self,fn="f.json"):
             if(self.l==1):
                 return
-            self.saved(self.term,"f.json")
+            self.saved(self.term.todict(),fn)
+    
+    def savemvj(self,fn="f2.json"):
+            s="".join(f"|{k} tank moved to {x},{y}" for k,x,y in self.mv.rows().tolist())
+            self.savedd(s,fn)
+            print("exported to ",fn)
 
     def checkif(self):
+        if self.l==1:
+            return 1
+        if os.path.exists("fin.tkh"):
+            self.term=tkbin.loadhm("fin.tkh",mmap=False)
+            self.l=1
+            return 1
         p="fin.json"
         if os.path.exists(p):
             with open(p,'r') as file:
-                self.term=json.load(file)
-                self.term=self.ck(self.term)
+                self.term=hmap.fromdict(json.load(file),self.rr)
                 self.l=1
                 return 1
         return 0
@@ -258,61 +325,34 @@ class tankin:
         return abs(x2-x1)+abs(y2-y1)+abs(z2-z1)
     
     def maxc(self,x):
-        if(x<0):
-            x=0
-        maxx=max(self.term)
-        if(x>maxx):
-            x=maxx
-        return x
+        return self.term.cx(x)
         
     def maxyc(self,y):
-        if(y<0):
-            y=0
-        maxx=max(self.term[max(self.term)])
-        if(y>maxx):
-            y=maxx
-        return y
+        return self.term.cy(y)
         
     def nearr(self,x,y):
-        difer=x%self.rr
-        dify=y%self.rr
-        difer=abs(int(x-difer))
-        dify=abs(int(y-dify))
-        if not dify in self.term[difer].keys():
+        if not self.term.inb(x,y):
         	return 0
-        return self.term[difer][dify]
+        return self.term.at(x,y)
         
     def doc(self,x,y):
-        if not x in self.term.keys():
-            self.term[x]={}
-            difx=x%self.rr
-            difx=abs(int(x-difx))
-            if not difx in self.term.keys():
-            	for i in self.term.keys():
-            		if i >=difx:
-            			self.term[difx]=self.term[i]
-            			break
-            self.term[x]=en2(self.term[difx])
-        if not y in self.term[x].keys():
-            self.term[x][y] = self.nearr(x,y)   
+        return self.term.at(x,y)
     
     def getsn(self,t):
             t.z=self.getsl(t.x,t.y)
             
     def getsl(self,x,y):
-            rx,ry=self.getsll(x,y)
-            return self.term[rx][ry]
+            return self.term.at(x,y)
             
     def getsll(self,x,y):
-            rx=x-x%self.rr 
-            ry=y-y%self.rr
-            return rx,ry
+            return self.term.snap(x,y)
             
     def ish(self,t,x,y,co):
         she=(x,y)
-        if t.sh.count(she)>co:
+        n=t.sh.get(she,0)
+        if n>co:
             return True
-        t.sh.append(she)
+        t.sh[she]=n+1
         return False
     
     def ishh(self,t):
@@ -329,7 +369,38 @@ class tankin:
     	mo=self.grefx(nx,ny,t)
     	return dx,dy,teh,mo,nx,ny
     
+    def plans(self,t):
+    	# one pass mask and path cache per slope limit, shared by every hull
+    	if t.tf not in self.pl:
+    		self.pl[t.tf]=plan.plans(plan.passm(self.term,float(t.tf)))
+    	return self.pl[t.tf]
+    
     def donv(self,t,x,y):
+    	x,y=self.maxc(x),self.maxyc(y)
+    	rr=self.rr
+    	cells=self.plans(t).get((int(t.x//rr),int(t.y//rr)),(int(x//rr),int(y//rr)))
+    	if cells is None:
+    		return self.donvg(t,x,y)
+    	self.wayp(t,cells,x,y)
+    
+    def wayp(self,t,cells,x,y):
+    	# unit steps along the planned cells, rr per cell from the snapped
+    	# start corner, then straight in to x,y inside the goal cell
+    	px,py=self.getsll(t.x,t.y)
+    	t.nv.append((px,py))
+    	for (i0,j0),(i1,j1) in zip(cells,cells[1:]):
+    		dx,dy=i1-i0,j1-j0
+    		for _ in range(self.rr):
+    			px+=dx
+    			py+=dy
+    			t.nv.append((px,py))
+    	while (px,py)!=(x,y):
+    		px+=(x>px)-(x<px)
+    		py+=(y>py)-(y<py)
+    		t.nv.append((px,py))
+    
+    def donvg(self,t,x,y):
+    	# greedy straight line probe, used when no plan reaches x,y
     	dx,dy,teh,mo=self.getm(t,x,y)
     	t.heading=teh
     	t.thead=teh
@@ -381,7 +452,7 @@ class tankin:
     	    	t.power=0
     	    	return
     	    t.hj=-1*t.hj
-    	    t.sh=[]
+    	    t.sh={}
     	    fo=(t.x,t.y)
     	    t.hc.append(fo)
     	    return
@@ -402,12 +473,10 @@ class tankin:
     		f2=[]
     		for j in range(iny-3*self.rr*mul,iny,1*self.rr):
     			xz=0
-    			try:
-    				xz=round(self.term[i][j])
+    			if self.term.inb(i,j):
+    				xz=round(self.term.at(i,j))
     				if i==x and y==j:
     					xz="*"
-    			except Exception:
-    				pass
     			f2.append(xz)
     		print(f2)
     		
@@ -423,8 +492,8 @@ class tankin:
             
      
     def rmove(self,t):
-        ss=f"{t.name} tank moved to {t.x},{t.y}"
-        self.mv.append(ss)
+        # by slot, the same id the array scheduler logs
+        self.mv.append((t.slot,t.x,t.y))
         
     def nex(self, t,dx,dy):
         nx = t.x + dx
@@ -513,53 +582,43 @@ class tankin:
                         return self.frm(45)		
         
     def loscheck(self,t11,t2):
-        starx=round(self.maxc(t11.x))
-        stary=round(self.maxyc(t11.y))
-        self.doc(starx,stary)
-        starz=round(self.term[starx][stary]+t1.tbarh())
-        ex=round(self.maxc(t2.x))
-        ey=round(self.maxyc(t2.y))
-        self.doc(ex,ey)
-        eh=round(t2.height+self.term[ex][ey])
-        dis=self.dcalc(starx,stary,ex,ey,starz,eh)
-        rann=t1.gr
-        if(dis>rann):
-            return False
-        dx=abs(ex-starx)
-        dy=abs(ey-stary)
-        x,y=starx,stary
-        sx=1 if starx<ex else -1
-        sy=1 if stary<ey else -1
-        grid=self.term
-        if dx > dy:
-            err=dx/2
-            while x != ex:
-                t=np.hypot(x-starx,y-stary)/np.hypot(ex-starx,ey-stary)
-                hol=starz+t*(eh-starz)
-                self.doc(x,y)
-                if grid[x][y]>hol:
-                    return False
-                err-=dy
-                if err <0:
-                    y+=sy
-                    err+=dx
-                x+=sx
-            else:
-                err=dy/2
-                while y!=ey:
-                    t=np.hypot(x-starx,y-stary)/np.hypot(ex-starx,ey-stary)
-                    hol=starz+t*(eh-starz)
-                    self.doc(x,y)
-                    if grid[x][y] >hol:
-                        return False
-                    err -= dx
-                    if err <0:
-                        x+=sx
-                        err+=dy
-                    y+=sy
-            if grid[ex][ey]>eh:
-                return False
-            return True
+        return bool(self.losm([t11],[t2])[0,0])
+    
+    def losm(self,ta,tb):
+        if self.losk is None:
+            t1=gett1()
+            self.losk=float(t1.tbarh()),float(t1.gr)
+        eye,rann=self.losk
+        a=[(t.x,t.y) for t in ta]
+        b=[(t.x,t.y) for t in tb]
+        # each target at its own hull height, as loscheck used t2.height
+        th=[tkjson.num(t.height) for t in tb]
+        return los.losm(self.term,a,eye,b,th,rann)
+    
+    def team(self,k):
+        return max(te for te in self.teams if te<=k)
+    
+    def sched(self,slots=None):
+        # array stepped scheduler over the hulls in slots (default all)
+        return tsched.sched(self,slots)
+    
+    def near(self,t,r=None,enemy=True):
+        # slots within r (default the hull's gun range) of t, enemies only
+        # unless enemy is False
+        r=float(t.gr) if r is None else r
+        ks=self.ix.near(t.x,t.y,r)
+        return [k for k in ks if k!=t.slot and (not enemy or self.team(k)!=t.team)]
+    
+    def nearest(self,t):
+        return self.ix.nearest(t.x,t.y,lambda k:self.team(k)!=t.team)
+    
+    def losall(self):
+        te=sorted(self.teams)
+        ka=[k for k in sorted(self.cf) if self.team(k)==te[0]]
+        kb=[k for k in sorted(self.cf) if self.team(k)==te[1]]
+        ta=[self.cf[k] for k in ka]
+        tb=[self.cf[k] for k in kb]
+        return ka,kb,self.losm(ta,tb),self.losm(tb,ta)
     
     def fol(self,t11,t2):
     	if len(t2.nv)!=0:
@@ -580,23 +639,27 @@ class tankin:
 def baseobj():
 	return tankin(0)            
 
-tt = tankin()
-dte=dt.now()
-tt.termm()
-print((dte-dt.now()).total_seconds())
-ts=''
-cd=1
-dte=dt.now()
-ttf=tt.cf[cd]
-foj=int(tt.midx)*10
-m=int(tt.midx)+1
-mm=int(tt.midy)+1
-for ig in range(foj):    
-    tt.peto(ttf,m,mm)
-tt.tse="|".join(tt.mv)
-ts=tt.tse
-dte=dte-dt.now()
-dte=dte.total_seconds()
-print(dte)
-tt.saved(tt.term,"f.json") 
-tt.savedd(ts,"f2.json")
+def main(js=False):
+	tt = tankin()
+	dte=dt.now()
+	tt.termm()
+	print((dte-dt.now()).total_seconds())
+	dte=dt.now()
+	foj=int(tt.midx)*10
+	m=int(tt.midx)+1
+	mm=int(tt.midy)+1
+	s=tt.sched()
+	s.goto(m,mm)
+	s.run(foj)
+	dte=dte-dt.now()
+	dte=dte.total_seconds()
+	print(dte)
+	tt.savem()
+	tt.savemv()
+	if js:
+		tt.savemj()
+		tt.savemvj()
+
+if __name__ == "__main__":
+	# python tankin.py [--json], --json also writes f.json and f2.json
+	main("--json" in sys.argv[1:])
@@ -0,0 +1,10 @@
+import pen
+
+def test_dopenr_explicit_armor_energy_density():
+    # an explicit plate takes its own energy density, like Material.pen;
+    # the default plate keeps steel's as dopen did
+    for key in ("steel", "du", "cf"):
+        mat = pen.mkround(pen.ROUNDS[0])
+        armor = pen.getmat(key)
+        pen.dopenr(mat, armor)
+        assert armor.material_energy_density_j_per_hvl == mat.f4 * pen.estfix(armor)
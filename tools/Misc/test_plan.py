@@ -0,0 +1,14 @@
+import numpy as np
+import hmap
+import plan
+
+def test_passm_same_for_any_block_size(monkeypatch):
+    # each block sees its neighbour rows through the halo, so row blocks
+    # must not show up as edges in the mask
+    h = hmap.hmap.fromarr(np.random.default_rng(1).normal(0, 3, (60, 40)), 4)
+    want = np.asarray(plan.passm(h, 2.0))
+    for blk in (200, 40, 1):
+        monkeypatch.setattr(hmap, "BLK", blk)
+        m = plan.passm(h, 2.0)
+        assert isinstance(m, np.memmap) and m.dtype == np.uint8
+        assert (m == want).all(), blk
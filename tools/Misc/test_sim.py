@@ -0,0 +1,16 @@
+import pytest
+import sim
+
+# eventloop only skips seconds in which mission() decides and draws
+# nothing, so paired replications of one seed must agree exactly
+@pytest.mark.parametrize("cfg", [
+    {},
+    {"maxtime": 3000},
+    {"sam_hit": 0.9, "sam1_cooldown": 5, "sam2_cooldown": 3},
+])
+def test_eventloop_matches_mission(cfg):
+    for rep in range(40):
+        a = sim.run(7, cfg, rep=rep)
+        b = sim.run(7, dict(cfg, events=True), rep=rep)
+        assert b.pop("steps") <= a["time"]
+        assert a == b, rep
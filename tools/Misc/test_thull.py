@@ -0,0 +1,34 @@
+import copy
+import numpy as np
+import thull
+
+def test_unit_turret_timing_cold_vehicle():
+    # getbar, turspe and ttimer all fill in state; on a unit it has to land
+    # on the shared vehicle class or in the unit's own slots
+    v = thull.dof("b", 1)
+    u = thull.unit(v, 0)
+    g, h = u.timett(90, 0)
+    assert g > 0 and h == 1
+    assert v.gr != 0 and u.gr == v.gr
+    want = u.timett(30, 10)
+    assert u.ttimer(30, 10) == want
+    assert (u.thead, u.tzh) == (30, 10)
+    assert (v.thead, v.tzh) == (0, 0)
+
+def test_unit_copy_keeps_turret():
+    u = thull.unit(thull.baseobj(), 1)
+    u.ttimer(0, 0)
+    c = copy.copy(u)
+    assert (c.thead, c.tzh) == (u.thead, u.tzh)
+    assert c.vc is u.vc
+
+def test_pentab_keyed_on_armor_shape():
+    # pen_batch reads the armor's f2/bafac, so changing them needs a new row
+    v = thull.dof("b", 1)
+    v.material = copy.copy(v.material)
+    r = v.getbar()
+    a = v.pentab(r)
+    v.material.f2 = 2
+    assert (v.pentab(r) != a).any()
+    assert all(isinstance(t, np.ndarray) for t in v.ptab.values())
+    assert v.armv() in v.atab.values()
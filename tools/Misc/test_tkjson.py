@@ -0,0 +1,12 @@
+import numpy as np
+import sympy as sp
+import tkjson
+
+def test_nonfinite_same_on_both_backends(monkeypatch):
+    # orjson writes inf/nan as null, stdlib json as Infinity/NaN
+    x = tkjson.plain({"a": float("inf"), "b": np.array([np.nan, 1.0]),
+                      "c": np.float64("-inf"), "d": sp.oo, 1: [2.5, sp.Rational(1, 2)]})
+    assert x == {"a": None, "b": [None, 1.0], "c": None, "d": None, "1": [2.5, 0.5]}
+    fast = tkjson.dumps(x)
+    monkeypatch.setattr(tkjson, "orjson", None)
+    assert tkjson.dumps(x) == fast
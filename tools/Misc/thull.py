@@ -1,9 +1,21 @@
+import os
+import sys
+import hashlib
+import pickle
+import functools
+import numpy as np
 import pen
 import nuct
+import cons
 import sympy as sp
 
-thres=(nuct.baseobj().gethw()*nuct.alpha).evalf()
+@functools.cache
+def getthres():
+	return (nuct.baseobj().gethw()*nuct.alpha).evalf()
+
 pro=nuct.PRECISION
+# pen table resolution in degrees of combined impact angle
+TSTEP=.01
 
 class thull:
 	def __init__(self, name, length, ammo, armorfront):
@@ -19,7 +31,7 @@ class thull:
 		self.height = self.width / 2
 		self.power = 1
 		self.fuel = 1
-		self.thres = thres
+		self.thres = getthres()
 		self.ammo = ammo
 		self.armorfront = armorfront
 		self.armorside = self.armorfront / 2
@@ -39,7 +51,7 @@ class thull:
 		self.frontbfan = 45
 		self.x=0
 		self.y=0
-		self.sh=[]
+		self.sh={}
 		self.bar=0
 		self.gr=0
 		self.tf=0
@@ -51,6 +63,15 @@ class thull:
 		self.nv=[]
 		self.hj=45
 		self.hc=[]
+		self.ptab={}
+		self.atab={}
+		self.grid=None
+		self.slot=None
+		self.team=None
+		
+	def shared(self):
+		# where the per vehicle caches go, a unit points this at its vc
+		return self
 		
 	def firehead(self):
 		self.ammo-=1
@@ -65,12 +86,14 @@ class thull:
 		fx=self.x+dx
 		fy=self.y+dy
 		self.x,self.y=fx,fy
+		if self.grid is not None:
+			self.grid.move(self.slot,fx,fy)
 		
 	def getrs(self,t):
-		if(self.so==0):
-			self.so=round(sp.N(self.rspe()*t))
-			return self.so
-		return self.so
+		v=self.shared()
+		if(v.so==0):
+			v.so=round(sp.N(self.rspe()*t))
+		return v.so
 		
 	
 	def turfrac(self):
@@ -85,17 +108,17 @@ class thull:
 			xfan=xan-self.heading
 			efan=90-zan
 			if(135>xfan>45 or -135<xfan<-45):
-				return self.material.pen(roundd,xfan,efan),self.armorside
+				return self.penlut(roundd,xfan,efan),self.armorside
 			if(xfan>135 or xfan<-135):
 				if(xfan>135):
 					xfan=270-xfan
-					return self.material.pen(roundd,xfan,efan),self.armorrear
+					return self.penlut(roundd,xfan,efan),self.armorrear
 				else:
 					xfan=270+xfan
-					return self.material.pen(roundd,xfan,efan),self.armorrear
+					return self.penlut(roundd,xfan,efan),self.armorrear
 			xfan=90-xfan
 			efan-=self.frontbfan
-			return self.material.pen(roundd,xfan,efan),self.armorfront
+			return self.penlut(roundd,xfan,efan),self.armorfront
 			
 	def turhit(self,xan,zan,roundd):
 		xfan=xan-self.thead
@@ -104,12 +127,68 @@ class thull:
 			efan-=self.frontbfan
 			xfan-=self.frontgfan
 			xfan+=90
-			return self.material.pen(roundd,xfan,efan),self.armorfront
+			return self.penlut(roundd,xfan,efan),self.armorfront
 		if(45<xfan<135 or -45>xfan>-135):
 			efan-=self.frontbfan
-			return self.material.pen(roundd,xfan,efan),self.armorside
-		return self.material.pen(roundd,xfan,efan),self.armorrear
+			return self.penlut(roundd,xfan,efan),self.armorside
+		return self.penlut(roundd,xfan,efan),self.armorrear
 	
+	def takehits(self,xan,zan,roundd):
+		# takehit over arrays of impact angles, one table lookup for all faces
+		xan,zan=np.broadcast_arrays(np.asarray(xan,dtype=np.float64),np.asarray(zan,dtype=np.float64))
+		turfrac=90-180*self.turfrac()
+		tur=zan>float(turfrac)
+		efan=90-zan
+		xh=xan-self.heading
+		hs=((45<xh)&(xh<135))|((-135<xh)&(xh<-45))
+		hr=~hs&((xh>135)|(xh<-135))
+		hf=~hs&~hr
+		xt=xan-self.thead
+		tf=(-45<xt)&(xt<45)
+		ts=~tf&(((45<xt)&(xt<135))|((-45>xt)&(xt>-135)))
+		tr=~tf&~ts
+		xf=np.select([tur&tf,tur,hr&(xh>135),hr,hf],[xt-self.frontgfan+90,xt,270-xh,270+xh,90-xh],xh)
+		ef=np.where((tur&(tf|ts))|(~tur&hf),efan-self.frontbfan,efan)
+		af,asi,ar=self.armv()
+		arm=np.select([tur&tf,tur&ts,tur&tr,hs,hr],[af,asi,ar,asi,ar],af)
+		return self.penlut(roundd,xf,ef),arm
+		
+	def armv(self):
+		# armor thicknesses as floats, evaluated once per set of values
+		k=(self.armorfront,self.armorside,self.armorrear)
+		if k not in self.atab:
+			self.atab[k]=tuple(float(a) for a in k)
+		return self.atab[k]
+		
+	def tabkey(self,roundd):
+		m=self.material
+		return (roundd.name,roundd.density,roundd.base_hvl,roundd.bafac,roundd.f2,roundd.f3,roundd.f4,
+			roundd.fill,roundd.exp,m.name,m.molar_mass,m.cohesive_energy_ev,m.density,m.base_hvl,
+			m.j_high_estimate,m.f2,m.bafac)
+		
+	def pentab(self,roundd):
+		# material.pen only sees the angle pair through combine_angles, so one
+		# row over the combined angle [0,90] covers every hull and turret face.
+		# Built once per hull material and round parameters; entry 0 holds the
+		# limit just above 0 degrees, exact zero is masked in penlut
+		k=self.tabkey(roundd)
+		if k not in self.ptab:
+			g=np.linspace(0,90,int(round(90/TSTEP))+1)
+			g[0]=1e-9
+			self.ptab[k]=self.material.pen_batch(roundd,g,90)
+		return self.ptab[k]
+		
+	def penlut(self,roundd,xfan,efan):
+		# interpolated lookup standing in for material.pen(roundd,xfan,efan)
+		t=self.pentab(roundd)
+		ang=pen.combine(xfan,efan)
+		u=ang/TSTEP
+		i=np.minimum(u.astype(np.int64),len(t)-2)
+		f=u-i
+		d=t[i]*(1-f)+t[i+1]*f
+		d=np.where(ang==0,0,d)
+		return float(d) if d.ndim==0 else d
+		
 	def getbar(self):
 		rd,speed,mass,_,du=self.getdd()
 		spee=pen.getspeed(du)
@@ -118,8 +197,9 @@ class thull:
 		du.f2=rd
 		du.f3=spee/speed
 		du.f4=1
-		self.bar=du
-		self.gr=self.bar.getrang()
+		v=self.shared()
+		v.bar=du
+		v.gr=du.getrang()
 		return du
 		
 	def getdd(self):
@@ -201,7 +281,7 @@ class thull:
 		return (axa/self.power)*self.getrps()
 		
 	def engmass(self):
-			self.material=pen.getsteel()
+			self.shared().material=pen.getsteel()
 			enr=self.enperkg()*self.matq
 			enf=self.fuelen()
 			return enf/enr
@@ -361,7 +441,7 @@ class thull:
 		if self.ttr!=0:
 			return self.ttr
 		foo=self.ttspe(self.turse(),self.rotd()/2,self.apup(),self.turm())
-		self.ttr=foo.evalf()
+		self.shared().ttr=foo.evalf()
 		return foo
 		
 	def hspe(self):
@@ -389,7 +469,7 @@ class thull:
 		gf.evalf()
 		gf=self.power/gf
 		gf**=1/3
-		self.tte=gf.evalf()
+		self.shared().tte=gf.evalf()
 		return gf
 		
 	def barrh(self):
@@ -482,6 +562,53 @@ class thull:
 		r*=self.width/2
 		return thull(self.name,self.length,self.ammo,r)
 		
+class unit:
+	"""Per tank state on top of a shared thull vehicle class.
+
+	Only the fields a tank changes while it drives and fights live here;
+	everything else (power, tf, gr, barrel, material, ...) is read from vc,
+	and thull methods run against the unit so they see its own position
+	and headings. Spawning or copying one is a handful of slots, the
+	physics graph is never duplicated."""
+	__slots__=("vc","name","x","y","z","heading","thead","tzh","ammo","power",
+		"nv","sh","hc","hj","slot","team","grid")
+	
+	def __init__(self,vc,name=None,x=0,y=0):
+		self.vc=vc
+		self.name=vc.name if name is None else name
+		self.x=x
+		self.y=y
+		self.z=0
+		self.heading=vc.heading
+		self.thead=vc.thead
+		self.tzh=vc.tzh
+		self.ammo=vc.ammo
+		self.power=vc.power
+		self.nv=[]
+		self.sh={}
+		self.hc=[]
+		self.hj=vc.hj
+		self.slot=None
+		self.team=None
+		self.grid=None
+		
+	def shared(self):
+		return self.vc
+		
+	def __getattr__(self,k):
+		if k=="vc" or k.startswith("__"):
+			raise AttributeError(k)
+		f=getattr(thull,k,None)
+		if callable(f):
+			return f.__get__(self)
+		return getattr(self.vc,k)
+		
+	def __copy__(self):
+		c=unit.__new__(unit)
+		for k in unit.__slots__:
+			setattr(c,k,getattr(self,k))
+		return c
+		
 def dof(name,l):
 	tt1=thull(name,l,pen.maxshot(),0.0)
 	return tt1.init()
@@ -490,10 +617,47 @@ def dofarm(l):
 	tt1=dof("b",l)
 	return tt1.addarmor().init()
 	
-def baseobj():
+def calbase():
 	d=dof("b",1)
 	return d.getbaseobj().addarmor().init()
 	
+CACHE=os.environ.get("THULL_CACHE",os.path.join(os.path.dirname(os.path.abspath(__file__)),".thcache"))
+
+def cachekey():
+	h=hashlib.sha256()
+	for m in (cons,nuct,pen,sys.modules[__name__]):
+		with open(m.__file__,"rb") as f:
+			h.update(f.read())
+	h.update(nuct.ENGINE.encode())
+	h.update(sp.__version__.encode())
+	return h.hexdigest()[:16]
+	
+def cachefn():
+	return os.path.join(CACHE,"base-"+cachekey()+".pkl")
+	
+def baseobj(cache=True):
+	if not cache:
+		d=calbase()
+		d.getbar()
+		return d
+	fn=cachefn()
+	try:
+		with open(fn,"rb") as f:
+			return pickle.load(f)
+	except (OSError,pickle.UnpicklingError,EOFError,AttributeError,ImportError):
+		pass
+	d=calbase()
+	d.getbar()
+	try:
+		os.makedirs(CACHE,exist_ok=True)
+		tmp=fn+"."+str(os.getpid())
+		with open(tmp,"wb") as f:
+			pickle.dump(d,f)
+		os.replace(tmp,fn)
+	except OSError:
+		pass
+	return d
+	
 def scaleobj(tm):
 	return baseobj().scalem(tm)
 	
@@ -0,0 +1,93 @@
+import os
+import struct
+import zlib
+import numpy as np
+import hmap as hm_
+from hmap import hmap
+
+# little endian headers, padded to HDR bytes so the payload stays aligned
+#   heightmap:  magic, version, flags, nx, ny, rr, dtype
+#   trajectory: magic, version, flags, rows, cols; then int32 columns
+HDR = 32
+HMAG = b"TKHM"
+TMAG = b"TKTR"
+VER = 1
+ZIP = 1
+HFMT = "<4sHHIII8s"
+TFMT = "<4sHHII"
+TCOLS = ("tank", "x", "y")
+
+def head(f, fmt, magic):
+    b = f.read(HDR)
+    h = struct.unpack(fmt, b[:struct.calcsize(fmt)])
+    if h[0] != magic:
+        raise ValueError(f"not a {magic.decode()} file")
+    if h[1] != VER:
+        raise ValueError(f"unsupported {magic.decode()} version {h[1]}")
+    return h
+
+def savehm(fn, hm, comp=False):
+    if isinstance(hm.h, np.memmap) and os.path.exists(fn) and os.path.samefile(hm.h.filename, fn):
+        # already streamed into this file by genhm
+        hm.h.flush()
+        return fn
+    a = np.ascontiguousarray(hm.h)
+    nx, ny = a.shape
+    dt = a.dtype.str.encode()
+    with open(fn, "wb") as f:
+        f.write(struct.pack(HFMT, HMAG, VER, ZIP if comp else 0, nx, ny, hm.rr, dt).ljust(HDR, b"\0"))
+        if comp:
+            f.write(zlib.compress(a.tobytes(), 6))
+        else:
+            a.tofile(f)
+    return fn
+
+def loadhm(fn, mmap=True):
+    with open(fn, "rb") as f:
+        _, _, flags, nx, ny, rr, dt = head(f, HFMT, HMAG)
+        dt = np.dtype(dt.rstrip(b"\0").decode())
+        if flags & ZIP:
+            a = np.frombuffer(zlib.decompress(f.read()), dtype=dt).reshape(nx, ny)
+            return hmap.fromarr(a, rr)
+        if not mmap:
+            return hmap.fromarr(np.fromfile(f, dtype=dt).reshape(nx, ny), rr)
+    return hmap.fromarr(np.memmap(fn, dtype=dt, mode="r", offset=HDR, shape=(nx, ny)), rr)
+
+def genhm(fn, nx, ny, rr, ran, wc, r2, wc1, dtype=np.float32):
+    """Generate terrain block by block straight into an uncompressed .tkh.
+
+    For grids too big to hold in memory; returns the file memory mapped."""
+    dt = np.dtype(dtype)
+    with open(fn, "wb") as f:
+        f.write(struct.pack(HFMT, HMAG, VER, 0, nx, ny, int(rr), dt.str.encode()).ljust(HDR, b"\0"))
+        f.truncate(HDR + nx * ny * dt.itemsize)
+    h = np.memmap(fn, dtype=dt, mode="r+", offset=HDR, shape=(nx, ny))
+    for i0, i1 in hm_.blocks(nx, ny):
+        h[i0:i1] = hm_.block(i0, i1, ny, rr, ran, wc, r2, wc1)
+        h.flush()
+    return hmap.fromarr(h, rr)
+
+def savetr(fn, rows):
+    a = np.asarray(rows, dtype="<i4").reshape(-1, len(TCOLS))
+    with open(fn, "wb") as f:
+        f.write(struct.pack(TFMT, TMAG, VER, 0, len(a), len(TCOLS)).ljust(HDR, b"\0"))
+        np.ascontiguousarray(a.T).tofile(f)
+    return fn
+
+def loadtr(fn):
+    with open(fn, "rb") as f:
+        _, _, _, n, nc = head(f, TFMT, TMAG)
+    if n == 0:
+        return {}
+    c = np.memmap(fn, dtype="<i4", mode="r", offset=HDR, shape=(nc, n))
+    return dict(zip(TCOLS, c))
+
+def paths(cols):
+    # per tank (steps, 2) x,y arrays in recorded order
+    if not cols:
+        return {}
+    tank = np.asarray(cols["tank"])
+    o = np.argsort(tank, kind="stable")
+    ids, st = np.unique(tank[o], return_index=True)
+    xy = np.stack([np.asarray(cols["x"])[o], np.asarray(cols["y"])[o]], axis=1)
+    return {int(i): p for i, p in zip(ids, np.split(xy, st[1:]))}
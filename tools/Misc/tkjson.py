@@ -0,0 +1,103 @@
+import json
+import math
+import numpy as np
+import sympy as sp
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# float values of sympy numbers already converted; hull fields are the same
+# few expressions in every snapshot, so each is evaluated once per process
+fc = {}
+
+# per tank columns written by state()
+UNIT = ("slot", "name", "team", "x", "y", "z", "heading", "thead", "ammo", "power")
+
+def num(v):
+    if isinstance(v, sp.Basic):
+        if v.free_symbols:
+            return str(v)
+        if v not in fc:
+            fc[v] = float(sp.N(v))
+        return fc[v]
+    if isinstance(v, np.bool_):
+        return bool(v)
+    if isinstance(v, np.integer):
+        return int(v)
+    if isinstance(v, np.floating):
+        return float(v)
+    return v
+
+def wire(v):
+    # num(v) as written out: orjson writes inf/nan as null while json
+    # writes Infinity/NaN, so both backends get null
+    v = num(v)
+    if isinstance(v, float) and not math.isfinite(v):
+        return None
+    return v
+
+def isnum(v):
+    if isinstance(v, sp.Basic):
+        return v.is_number
+    return isinstance(v, (int, float, np.number)) and not isinstance(v, bool)
+
+def plain(x):
+    """x with sympy/numpy numbers as floats/ints, inf/nan as None and dict
+    keys as str."""
+    if isinstance(x, dict):
+        return {str(num(k)): plain(v) for k, v in x.items()}
+    if isinstance(x, (list, tuple, set)):
+        return [plain(v) for v in x]
+    if isinstance(x, np.ndarray):
+        if x.dtype.kind == "f" and not np.isfinite(x).all():
+            return plain(x.tolist())
+        return x.tolist()
+    return wire(x)
+
+def cols(units):
+    return {f: [wire(getattr(u, f)) for u in units] for f in UNIT}
+
+def fields(obj):
+    # the plain numeric attributes of a shared vehicle class
+    return {k: wire(v) for k, v in vars(obj).items() if isnum(v)}
+
+def state(tt):
+    """Snapshot of a tankin game as plain columns."""
+    ks = sorted(tt.cf)
+    units = [tt.cf[k] for k in ks]
+    vcs = {}
+    for u in units:
+        vc = getattr(u, "vc", u)
+        vcs.setdefault(id(vc), vc)
+    return {"units": cols(units),
+            "vclass": [fields(vc) for vc in vcs.values()],
+            "moves": len(tt.mv)}
+
+def dumps(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+def save(fn, obj):
+    if fn.endswith(".msgpack"):
+        if msgpack is None:
+            raise ImportError("msgpack is needed to write " + fn)
+        b = msgpack.packb(obj)
+    else:
+        b = dumps(obj)
+    with open(fn, "wb") as f:
+        f.write(b)
+    return fn
+
+def load(fn):
+    with open(fn, "rb") as f:
+        b = f.read()
+    if fn.endswith(".msgpack"):
+        return msgpack.unpackb(b, strict_map_key=False)
+    return json.loads(b)
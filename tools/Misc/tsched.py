@@ -0,0 +1,155 @@
+import numpy as np
+import los
+
+# heading in degrees for a unit step, indexed by (dx+1)*3+(dy+1); same
+# table as tankin.fom, -1 where there is no step
+HEAD = np.array([225, 180, 135, 270, -1, 90, 315, 0, 45], dtype=np.float64)
+
+class mlog:
+    """Preallocated int32 move log, (slot, x, y) rows; the buffer doubles
+    when full so every move reaches savemv."""
+    def __init__(self, cap=1 << 16, cols=3):
+        self.a = np.zeros((cap, cols), dtype=np.int32)
+        self.n = 0
+
+    def __len__(self):
+        return self.n
+
+    def room(self, k):
+        if self.n + k > len(self.a):
+            a = np.zeros((max(2 * len(self.a), self.n + k), self.a.shape[1]), dtype=np.int32)
+            a[:self.n] = self.a[:self.n]
+            self.a = a
+
+    def append(self, row):
+        self.room(1)
+        self.a[self.n] = row
+        self.n += 1
+
+    def extend(self, rows):
+        rows = np.asarray(rows, dtype=np.int32)
+        self.room(len(rows))
+        self.a[self.n:self.n + len(rows)] = rows
+        self.n += len(rows)
+
+    def rows(self):
+        return self.a[:self.n]
+
+class sched:
+    """Advances a set of tankin hulls one tick at a time as arrays.
+
+    Position, height, heading and power live here as one array per field;
+    each tick every live hull takes up to t.so steps along its planned
+    waypoints, with the slope rule of tankin.torc checked for all hulls
+    and steps in one pass. The hull objects are written back by sync."""
+    def __init__(self, tt, slots=None):
+        self.tt = tt
+        self.k = np.array(sorted(tt.cf) if slots is None else list(slots), dtype=np.int64)
+        ts = [tt.cf[k] for k in self.k]
+        n = len(ts)
+        self.x = np.array([t.x for t in ts], dtype=np.int64)
+        self.y = np.array([t.y for t in ts], dtype=np.int64)
+        self.z = np.array([float(t.z) for t in ts], dtype=np.float64)
+        self.heading = np.array([float(t.heading) for t in ts], dtype=np.float64)
+        self.power = np.array([t.power != 0 for t in ts], dtype=bool)
+        self.so = np.array([int(t.so) for t in ts], dtype=np.int64)
+        self.tf = np.array([float(t.tf) for t in ts], dtype=np.float64)
+        self.gx = self.x.copy()
+        self.gy = self.y.copy()
+        self.wp = [np.zeros((0, 2), dtype=np.int64)] * n
+        self.p = np.zeros(n, dtype=np.int64)
+        self.hc = [set() for _ in range(n)]
+        self.flat()
+
+    def flat(self):
+        # all waypoints in one array so a tick gathers with one fancy index
+        self.len = np.array([len(w) for w in self.wp], dtype=np.int64)
+        self.off = np.concatenate(([0], np.cumsum(self.len)[:-1]))
+        self.w = np.concatenate(self.wp + [np.zeros((1, 2), dtype=np.int64)])
+
+    def goto(self, x, y, slots=None):
+        i = slice(None) if slots is None else np.isin(self.k, list(slots))
+        self.gx[i] = self.tt.maxc(int(x))
+        self.gy[i] = self.tt.maxyc(int(y))
+        self.p[i] = self.len[i]
+
+    def plan(self, i):
+        # hand the hull to tankin.donv for a fresh waypoint list; a hull that
+        # has to replan from a spot it already replanned from gives up, like
+        # the hc check in tankin.rm
+        at = (int(self.x[i]), int(self.y[i]))
+        if at in self.hc[i]:
+            self.power[i] = False
+            return
+        self.hc[i].add(at)
+        t = self.tt.cf[int(self.k[i])]
+        t.x, t.y, t.z = at[0], at[1], float(self.z[i])
+        t.nv = []
+        self.tt.donv(t, int(self.gx[i]), int(self.gy[i]))
+        self.wp[i] = np.array(t.nv, dtype=np.int64).reshape(-1, 2)
+        t.nv = []
+        self.p[i] = 0
+        if len(self.wp[i]) == 0:
+            self.power[i] = False
+
+    def busy(self):
+        return bool(np.any(self.power & ((self.p < self.len) | (self.x != self.gx) | (self.y != self.gy))))
+
+    def tick(self):
+        need = np.nonzero(self.power & (self.p >= self.len) & ((self.x != self.gx) | (self.y != self.gy)))[0]
+        if len(need):
+            for i in need:
+                self.plan(i)
+            self.flat()
+            self.sync(need)
+        S = int(self.so.max()) if len(self.so) else 0
+        if S == 0:
+            return 0
+        s = np.arange(S)[None, :]
+        idx = self.p[:, None] + s
+        valid = self.power[:, None] & (s < self.so[:, None]) & (idx < self.len[:, None])
+        gi = np.where(valid, self.off[:, None] + idx, len(self.w) - 1)
+        px = self.w[gi, 0]
+        py = self.w[gi, 1]
+        h = los.ground(self.tt.term, px, py)
+        zp = np.concatenate((self.z[:, None], h[:, :-1]), axis=1)
+        ok = valid & ((h - zp) * .5 <= self.tf[:, None])
+        run = np.cumprod(ok, axis=1).astype(bool)
+        nst = run.sum(axis=1)
+        # a step the slope rule refuses drops the rest of the plan
+        blocked = nst < valid.sum(axis=1)
+        r, c = np.nonzero(run)
+        if len(r):
+            self.tt.mv.extend(np.stack((self.k[r], px[r, c], py[r, c]), axis=1))
+        m = np.nonzero(nst)[0]
+        last = nst[m] - 1
+        ox = np.where(last > 0, px[m, np.maximum(last - 1, 0)], self.x[m])
+        oy = np.where(last > 0, py[m, np.maximum(last - 1, 0)], self.y[m])
+        self.x[m] = px[m, last]
+        self.y[m] = py[m, last]
+        self.z[m] = h[m, last]
+        hd = HEAD[(np.sign(self.x[m] - ox) + 1) * 3 + np.sign(self.y[m] - oy) + 1]
+        self.heading[m] = np.where(hd < 0, self.heading[m], hd)
+        self.p += nst
+        self.p[blocked] = self.len[blocked]
+        self.sync(m)
+        return len(m)
+
+    def run(self, n):
+        """Up to n ticks, stopping early once no hull has anything left to do."""
+        for i in range(n):
+            if not self.busy():
+                return i
+            self.tick()
+        return n
+
+    def sync(self, m=None):
+        m = range(len(self.k)) if m is None else m
+        for i in m:
+            t = self.tt.cf[int(self.k[i])]
+            t.x, t.y = int(self.x[i]), int(self.y[i])
+            t.z = float(self.z[i])
+            t.heading = t.thead = float(self.heading[i])
+            t.power = t.power if self.power[i] else 0
+            if t.grid is not None:
+                t.grid.move(t.slot, t.x, t.y)
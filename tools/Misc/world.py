@@ -0,0 +1,257 @@
+import numpy as np
+import sim
+from streams import streams
+
+# interceptor kinds: missile armed (MiG25) and gun armed (MiG23)
+MSL = 0
+GUN = 1
+# sim.Missile constants and the ranges the mission loop uses
+MSL_SPEED = 3000.0
+MSL_TURN = 20.0
+MSL_FUSE = 0.2
+DOGFIGHT = 5.0
+GUN_CONE = 10.0
+
+def move(p, heading, speed, dt):
+    # sim.advance for a whole column of positions, headings and speeds
+    d = speed * (dt / 3600)
+    r = np.radians(heading)
+    return p + np.column_stack((d * np.cos(r), d * np.sin(r)))
+
+class world:
+    """Every enemy, interceptor, missile and SAM site of a raid as arrays.
+
+    One array per field and entity kind, row i of each describing the same
+    entity; step(dt) advances all of them together with the rules of
+    sim.mission, distances and bearings coming from one matrix per pair of
+    kinds. MiG27 ground attack is not modelled here.
+
+    Draws come from one stream of rs per subsystem (radar, gci, guns, ...),
+    each taking one value per row every step, so a row's draws depend on
+    the seed, its index and the time only."""
+    def __init__(self, rs=None):
+        self.rs = rs if rs is not None else streams()
+        self.t = 0.0
+        # enemies
+        self.eid = []
+        self.ep = np.zeros((0, 2))
+        self.eh = np.zeros(0)
+        self.es = np.zeros(0)
+        self.rcs = np.zeros(0)
+        self.ealive = np.zeros(0, dtype=bool)
+        # interceptors
+        self.name = []
+        self.kind = np.zeros(0, dtype=np.int8)
+        self.p = np.zeros((0, 2))
+        self.h = np.zeros(0)
+        self.s = np.zeros(0)
+        self.fuel = np.zeros(0)
+        self.burn = np.zeros(0)
+        self.alive = np.zeros(0, dtype=bool)
+        self.rtb = np.zeros(0, dtype=bool)
+        self.evt = np.zeros(0)
+        self.dog = np.zeros(0, dtype=bool)
+        self.fire = np.zeros(0)
+        self.rmax = np.zeros(0)
+        self.det = np.zeros(0)
+        self.jam = np.zeros(0)
+        self.cmdfail = np.zeros(0)
+        self.hitp = np.zeros(0)
+        self.fired = np.zeros(0, dtype=np.int64)
+        # missiles in flight: owner and target rows
+        self.mp = np.zeros((0, 2))
+        self.mh = np.zeros(0)
+        self.mo = np.zeros(0, dtype=np.int64)
+        self.mt = np.zeros(0, dtype=np.int64)
+        # SAM sites
+        self.sname = []
+        self.sp = np.zeros((0, 2))
+        self.srange = np.zeros(0)
+        self.cd = np.zeros(0)
+        self.cdt = np.zeros(0)
+        self.shit = np.zeros(0)
+        self.shots = np.zeros(0, dtype=np.int64)
+        self.skills = np.zeros(0, dtype=np.int64)
+
+    def cat(self, **cols):
+        for k, v in cols.items():
+            setattr(self, k, np.concatenate((getattr(self, k), np.asarray(v, dtype=getattr(self, k).dtype))))
+
+    def add_enemies(self, enemies):
+        """sim.EnemyAircraft objects."""
+        self.eid += [e.id for e in enemies]
+        self.cat(ep=[e.position for e in enemies] or np.zeros((0, 2)),
+                 eh=[e.heading for e in enemies], es=[e.speed for e in enemies],
+                 rcs=[e.rcs for e in enemies], ealive=[e.alive for e in enemies])
+
+    def add_migs(self, migs):
+        """sim.MiG25 and sim.MiG23 objects."""
+        self.name += [m.name for m in migs]
+        gun = [isinstance(m, sim.MiG23) for m in migs]
+        self.cat(kind=[GUN if g else MSL for g in gun],
+                 p=[m.position for m in migs] or np.zeros((0, 2)),
+                 h=[m.heading for m in migs], s=[m.speed for m in migs],
+                 fuel=[m.fuel for m in migs], burn=[m.fuel_burn_rate for m in migs],
+                 alive=[bool(m.alive) for m in migs], rtb=[m.rtb_mode for m in migs],
+                 evt=[getattr(m, "evasive_time", 0) if getattr(m, "evasive", False) else 0 for m in migs],
+                 dog=[getattr(m, "dogfight_mode", False) for m in migs],
+                 fire=[m.max_fire_range for m in migs],
+                 rmax=[m.radar.max_range_km for m in migs],
+                 det=[m.radar.base_detection_prob for m in migs],
+                 jam=[m.radar.jamming_level for m in migs],
+                 cmdfail=[m.command_failure_chance for m in migs],
+                 hitp=[m.gun_hit_chance if g else m.missile_hit_chance for m, g in zip(migs, gun)],
+                 fired=[m.weapons_fired for m in migs])
+
+    def add_sams(self, sams):
+        """sim.GroundDefense objects."""
+        self.sname += [s.name for s in sams]
+        self.cat(sp=[s.position for s in sams] or np.zeros((0, 2)),
+                 srange=[s.fire_range_km for s in sams], cd=[s.cooldown for s in sams],
+                 cdt=[s.cooldown_time for s in sams], shit=[s.hit_chance for s in sams],
+                 shots=[s.shots for s in sams], skills=[s.kills for s in sams])
+
+    def step(self, dt=1.0):
+        rs = self.rs
+        live = self.ealive
+        self.ep[live] = move(self.ep[live], self.eh[live], self.es[live], dt)
+
+        act = self.alive & ~self.rtb
+        if not live.any():
+            # nothing left to chase sends everyone home
+            self.rtb |= act
+            self.missiles(dt)
+            self.sams(dt)
+            self.t += dt
+            return
+        # nearest live enemy of every interceptor
+        D = sim.dists(self.p, self.ep)
+        D[:, ~live] = np.inf
+        tgt = D.argmin(axis=1)
+        r = D[np.arange(len(self.p)), tgt]
+        d = self.ep[tgt] - self.p
+        brg = np.degrees(np.arctan2(d[:, 1], d[:, 0])) % 360
+
+        # MiG25: radar, then GCI and a missile if none is in the air
+        msl = act & (self.kind == MSL)
+        pd = sim.chance(r, self.rcs[tgt], self.rmax, self.det, self.jam)
+        seen = msl & (rs("radar").random(len(self.p)) < pd)
+        # MiG23 always takes GCI and steers only outside a dogfight
+        gun = act & (self.kind == GUN)
+        cmd = (seen | gun) & (rs("gci").random(len(self.p)) >= self.cmdfail)
+        steer = cmd & ~(gun & self.dog)
+        self.h[steer] = brg[steer]
+        busy = np.zeros(len(self.p), dtype=bool)
+        busy[self.mo] = True
+        launch = np.nonzero(seen & ~busy & (r <= self.fire))[0]
+        if len(launch):
+            self.fired[launch] += 1
+            self.evt[launch] = 10
+            self.cat(mp=self.p[launch], mh=self.h[launch], mo=launch, mt=tgt[launch])
+
+        # MiG23 guns inside the dogfight radius
+        self.dog = np.where(gun, r < DOGFIGHT, self.dog)
+        off = np.abs((brg - self.h + 180) % 360 - 180)
+        shoot = gun & self.dog & (r <= self.fire) & (off <= GUN_CONE)
+        self.fired[shoot] += 1
+        hit = shoot & (rs("guns").random(len(self.p)) < self.hitp)
+        self.ealive[tgt[hit]] = False
+
+        # fuel and movement; an empty tank lands the aircraft where it is
+        dry = act & (self.fuel <= 0)
+        self.s[dry] = 0
+        self.rtb |= dry
+        fly = act & ~dry
+        ev = self.evt > 0
+        f = np.where(ev & (self.kind == MSL), 2.0, np.where(self.dog & (self.kind == GUN), 1.5, 1.0))
+        self.fuel[fly] -= (self.burn * dt * f)[fly]
+        jit = fly & self.dog & (self.kind == GUN)
+        self.h[jit] = (self.h[jit] + rs("jitter").uniform(-10, 10, len(self.p))[jit]) % 360
+        self.p[fly] = move(self.p[fly], self.h[fly], self.s[fly], dt)
+        self.evt[fly & ev] = np.maximum(self.evt[fly & ev] - dt, 0)
+
+        self.missiles(dt)
+        self.sams(dt)
+        self.t += dt
+
+    def missiles(self, dt):
+        # pure pursuit with the sim.Missile turn limit, one roll on arrival
+        # taken from the launcher's row
+        roll = self.rs("missiles").random(len(self.p))
+        keep = self.ealive[self.mt] & self.alive[self.mo] & ~self.rtb[self.mo]
+        self.mp, self.mh, self.mo, self.mt = self.mp[keep], self.mh[keep], self.mo[keep], self.mt[keep]
+        if not len(self.mt):
+            return
+        tp = self.ep[self.mt]
+        want = np.degrees(np.arctan2(tp[:, 1] - self.mp[:, 1], tp[:, 0] - self.mp[:, 0])) % 360
+        turn = MSL_TURN * dt
+        self.mh = (self.mh + np.clip((want - self.mh + 180) % 360 - 180, -turn, turn)) % 360
+        self.mp = move(self.mp, self.mh, MSL_SPEED, dt)
+        near = np.hypot(*(tp - self.mp).T) < MSL_FUSE
+        hit = near & (roll[self.mo] < self.hitp[self.mo])
+        self.ealive[self.mt[hit]] = False
+        self.mp, self.mh, self.mo, self.mt = self.mp[~near], self.mh[~near], self.mo[~near], self.mt[~near]
+
+    def sams(self, dt):
+        # a ready site fires at the first aircraft inside its fire range;
+        # cooldown runs on time rather than per aircraft checked as in
+        # GroundDefense.engage
+        self.cd = np.maximum(self.cd - dt, 0)
+        if not len(self.sp) or not self.alive.any():
+            return
+        ready = np.nonzero(self.cd <= 0)[0]
+        up = np.nonzero(self.alive)[0]
+        i, j, d = sim.within(self.sp[ready], self.p[up], self.srange[ready])
+        inr = np.zeros((len(ready), len(up)), dtype=bool)
+        inr[i, j] = d < self.srange[ready][i]
+        for k in np.nonzero(inr.any(axis=1))[0]:
+            row = inr[k] & self.alive[up]
+            if not row.any():
+                continue
+            i, j = ready[k], up[np.argmax(row)]
+            self.cd[i] = self.cdt[i]
+            self.shots[i] += 1
+            pen = 0.5 if self.evt[j] > 0 else 1.0
+            if self.rs(self.sname[i]).random() < self.shit[i] * pen:
+                self.alive[j] = False
+                self.skills[i] += 1
+
+    def busy(self):
+        # sim.mission's end condition: SAMs keep shooting at parked aircraft
+        return bool(self.ealive.any() and self.alive.any())
+
+    def run(self, tmax=sim.maxtime, dt=1.0):
+        """Step until tmax seconds or until one side has nothing left."""
+        while self.t < tmax and self.busy():
+            self.step(dt)
+        return self.outcome()
+
+    def outcome(self):
+        return {
+            "kills": int((~self.ealive).sum()),
+            "enemies": len(self.eid),
+            "rtb": int((self.rtb | (self.fuel <= 0) | (self.s == 0)).sum()),
+            "sorties": len(self.name),
+            "migs_lost": int((~self.alive).sum()),
+            "weapons": int(self.fired.sum()),
+            "sam_shots": int(self.shots.sum()),
+            "sam_kills": int(self.skills.sum()),
+            "time": self.t,
+        }
+
+def raid(bombers=300, fighters=100, mig25=24, mig23=24, sams=(), seed=None):
+    """A world with the sim.generate_random_enemies mix drawn in bulk."""
+    w = world(streams(seed))
+    n = bombers + fighters
+    rng = w.rs("raid")
+    big = np.arange(n) < bombers
+    w.eid = [f"Enemy{i+1}" for i in range(n)]
+    w.ep = np.column_stack((rng.uniform(30, 100, n), rng.uniform(-50, 50, n)))
+    w.eh = rng.uniform(180, 360, n)
+    w.es = np.where(big, rng.uniform(700, 900, n), rng.uniform(1100, 1400, n))
+    w.rcs = np.where(big, rng.uniform(8, 15, n), rng.uniform(1.5, 4.0, n))
+    w.ealive = np.ones(n, dtype=bool)
+    w.add_migs([sim.MiG25(f"MiG25_{i+1}") for i in range(mig25)] +
+               [sim.MiG23(f"MiG23_{i+1}") for i in range(mig23)])
+    w.add_sams(list(sams))
+    return w